@@ -35,6 +35,17 @@ server {
     listen 80;
     server_name telegram-api.wazobiacode.com;
 
+    # scraped locally by prometheus, not exposed publicly
+    location /metrics {
+        deny all;
+    }
+
+    location /telegram/webhook {
+        proxy_pass http://localhost:8001;
+        proxy_set_header Host \$host;
+        proxy_set_header X-Real-IP \$remote_addr;
+    }
+
     location / {
         proxy_pass http://localhost:8000;
         proxy_set_header Host \$host;
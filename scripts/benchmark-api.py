@@ -0,0 +1,231 @@
+"""benchmark-api
+
+Load-tests `api_service` against a local fake Telegram Bot API.
+
+The fake server answers `sendMessage`, `createChatInviteLink` and `getMe` with
+configurable latency, error rate and injected 429 RetryAfter responses. The
+FastAPI app is driven in-process and a throughput/latency report is printed,
+so changes to concurrency and rate-limit settings can be compared offline.
+
+Run from the repository root:
+
+    python scripts/benchmark-api.py --scenario send-invites --invites 20 --users 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from itertools import count
+
+from benchmark_utils import apply_dummy_settings, percentile
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark api_service offline")
+    parser.add_argument(
+        "--scenario",
+        choices=["send-message", "send-messages", "send-invites"],
+        default="send-message",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="HTTP requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="HTTP clients")
+    parser.add_argument("--batch", type=int, default=50, help="messages per batch")
+    parser.add_argument("--invites", type=int, default=5, help="invites per batch")
+    parser.add_argument("--users", type=int, default=50, help="users per invite")
+    parser.add_argument("--latency", type=float, default=50, help="stub latency (ms)")
+    parser.add_argument("--jitter", type=float, default=20, help="latency jitter (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1, help="seconds")
+    parser.add_argument("--port", type=int, default=8081, help="stub server port")
+    parser.add_argument("--max-concurrency", type=int, help="overrides MAX_CONCURRENCY")
+    parser.add_argument("--global-rate", type=float, help="TELEGRAM_GLOBAL_RATE")
+    parser.add_argument("--chat-rate", type=float, help="TELEGRAM_CHAT_RATE")
+    return parser.parse_args()
+
+
+def configure_env(args):
+    """Point `common.bot` at the stub server; must run before importing the app."""
+    overrides = {
+        "TELEGRAM_BASE_URL": f"http://127.0.0.1:{args.port}/bot",
+        "MAX_CONCURRENCY": args.max_concurrency,
+        "TELEGRAM_GLOBAL_RATE": args.global_rate,
+        "TELEGRAM_CHAT_RATE": args.chat_rate,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            os.environ[key] = str(value)
+
+    apply_dummy_settings(os.environ)
+
+
+class FakeBotAPI:
+    """Minimal Bot API stub with injectable latency, errors and 429s."""
+
+    def __init__(self, args):
+        self.args = args
+        self.calls: dict[str, int] = {}
+        self.retry_afters = 0
+        self.errors = 0
+        self._ids = count(1)
+
+    def _user(self, user_id: int, is_bot: bool = False) -> dict:
+        return {"id": user_id, "is_bot": is_bot, "first_name": "bench"}
+
+    def _result(self, method: str, form: dict):
+        if method == "getMe":
+            return self._user(1, is_bot=True) | {"username": "benchmark_bot"}
+        if method == "createChatInviteLink":
+            return {
+                "invite_link": f"https://t.me/+bench{next(self._ids)}",
+                "creator": self._user(1, is_bot=True),
+                "creates_join_request": False,
+                "is_primary": False,
+                "is_revoked": False,
+            }
+        chat_id = int(form.get("chat_id", 0))
+        return {
+            "message_id": next(self._ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"},
+            "text": form.get("text", ""),
+        }
+
+    async def __call__(self, scope, receive, send):
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse
+
+        if scope["type"] != "http":
+            return
+
+        request = Request(scope, receive)
+        method = request.url.path.rsplit("/", 1)[-1]
+        form = dict(await request.form())
+
+        delay = self.args.latency + random.uniform(-1, 1) * self.args.jitter
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        roll = random.random()
+        error_rate = self.args.retry_after_rate + self.args.error_rate
+        if method != "getMe" and roll < self.args.retry_after_rate:
+            self.retry_afters += 1
+            body = {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.args.retry_after}",
+                "parameters": {"retry_after": self.args.retry_after},
+            }
+            response = JSONResponse(body, status_code=429)
+        elif method != "getMe" and roll < error_rate:
+            self.errors += 1
+            body = {
+                "ok": False,
+                "error_code": 400,
+                "description": "Bad Request: injected",
+            }
+            response = JSONResponse(body, status_code=400)
+        else:
+            response = JSONResponse({"ok": True, "result": self._result(method, form)})
+        await response(scope, receive, send)
+
+
+def build_requests(args):
+    user_ids = count(1000)
+    for i in range(args.requests):
+        if args.scenario == "send-message":
+            yield "/send-message", {"chat_id": str(next(user_ids)), "message": "hi"}
+        elif args.scenario == "send-messages":
+            messages = [
+                {"chat_id": str(next(user_ids)), "message": "hi"}
+                for _ in range(args.batch)
+            ]
+            yield "/send-messages", {"messages": messages}
+        else:
+            invites = [
+                {
+                    "chat_id": str(-100 - (i * args.invites + j)),
+                    "user_ids": [str(next(user_ids)) for _ in range(args.users)],
+                    "message": "Welcome to the cohort!",
+                }
+                for j in range(args.invites)
+            ]
+            yield "/send-invites", {"invites": invites}
+
+
+async def run(args):
+    import httpx
+    import uvicorn
+
+    stub = FakeBotAPI(args)
+    server = uvicorn.Server(
+        uvicorn.Config(stub, host="127.0.0.1", port=args.port, log_level="error")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    from api_service import create_app
+
+    latencies, statuses = [], {}
+    queue = list(build_requests(args))
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+
+    async def client_worker(client: httpx.AsyncClient):
+        while queue:
+            path, body = queue.pop()
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://api",
+            headers={"X-API-Key": os.environ["API_KEY"]},
+            timeout=None,
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *[client_worker(client) for _ in range(args.concurrency)]
+            )
+            elapsed = time.perf_counter() - start
+
+    server.should_exit = True
+    await server_task
+    return stub, latencies, statuses, elapsed
+
+
+def report(args, stub, latencies, statuses, elapsed):
+    sent = stub.calls.get("sendMessage", 0)
+    print(f"\nscenario          {args.scenario}")
+    rate = len(latencies) / elapsed
+    print(f"http requests     {len(latencies)} in {elapsed:.2f}s ({rate:.1f} req/s)")
+    print(f"http statuses     {json.dumps(statuses)}")
+    print(f"latency p50       {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latency p95       {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"latency p99       {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"latency mean      {statistics.fmean(latencies) * 1000:.1f} ms")
+    print(f"telegram calls    {json.dumps(stub.calls)}")
+    print(f"injected 429s     {stub.retry_afters}")
+    print(f"injected errors   {stub.errors}")
+    print(f"messages/sec      {sent / elapsed:.1f}")
+
+
+def main():
+    args = parse_args()
+    configure_env(args)
+    sys.path.append("src")
+    report(args, *asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""benchmark-embeddings
+
+Compares the embedding backends of the old RAG bot (`src/old/encoders.py`).
+
+Each backend runs in its own process so peak RSS is not shared. For every
+backend the script reports model load time, single-query latency, batch
+throughput (texts/sec) and peak RSS, then checks that its embeddings match
+the torch backend: the lowest cosine similarity must reach `--tolerance`.
+
+Run from the repository root (the first ONNX run exports and quantizes the
+model, later runs reuse the files):
+
+    python scripts/benchmark-embeddings.py --model sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark_utils import percentile
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+TOPICS = ["closures", "promises", "prototypes", "classes", "modules", "generators"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--model", required=True, help="EMBEDDING_MODEL to load")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--texts", type=int, default=512, help="texts in the batch run")
+    parser.add_argument("--queries", type=int, default=100, help="single-text encodes")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.99, help="min cosine vs torch"
+    )
+    parser.add_argument("--onnx-dir", type=Path, default=Path("src/onnx-models"))
+    return parser.parse_args()
+
+
+def sample_texts(n: int) -> list[str]:
+    return [
+        f"Question {i}: how do {TOPICS[i % len(TOPICS)]} work in JavaScript, "
+        f"and when should I use them instead of {TOPICS[(i * 7 + 3) % len(TOPICS)]}?"
+        for i in range(n)
+    ]
+
+
+def run_backend(backend: str, args) -> dict:
+    sys.path.append("src/old")
+    from encoders import load_encoder
+
+    started = time.perf_counter()
+    encoder = load_encoder(backend, args.model, args.onnx_dir)
+    load_seconds = time.perf_counter() - started
+
+    texts = sample_texts(args.texts)
+    encoder.encode(texts[:8], batch_size=8)  # warm up
+
+    latencies = []
+    for text in texts[: args.queries]:
+        started = time.perf_counter()
+        encoder.encode([text], batch_size=1)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    embeddings = encoder.encode(texts, batch_size=args.batch_size)
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "texts_per_sec": len(texts) / batch_seconds,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "embeddings": np.asarray(embeddings, dtype=np.float32),
+    }
+
+
+def report(
+    backend: str, result: dict, reference: np.ndarray | None, tolerance: float
+) -> bool:
+    latencies = result["latencies"]
+    print(f"\n{backend}")
+    print(f"  load            {result['load_seconds']:8.2f} s")
+    print(f"  query p50       {percentile(latencies, 50) * 1000:8.2f} ms")
+    print(f"  query p95       {percentile(latencies, 95) * 1000:8.2f} ms")
+    print(f"  query mean      {statistics.fmean(latencies) * 1000:8.2f} ms")
+    print(f"  batch           {result['texts_per_sec']:8.1f} texts/s")
+    print(f"  peak rss        {result['rss_mb']:8.1f} MB")
+
+    if reference is None or backend == "torch":
+        return True
+    cosine = (result["embeddings"] * reference).sum(axis=1)
+    ok = float(cosine.min()) >= tolerance
+    print(
+        f"  cosine vs torch min {cosine.min():.5f}  mean {cosine.mean():.5f}"
+        f"  ({'ok' if ok else f'below {tolerance}'})"
+    )
+    return ok
+
+
+def main():
+    args = parse_args()
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, args))
+
+    reference = results["torch"]["embeddings"] if "torch" in results else None
+    ok = all(
+        [
+            report(backend, result, reference, args.tolerance)
+            for backend, result in results.items()
+        ]
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
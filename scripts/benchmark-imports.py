@@ -0,0 +1,104 @@
+"""benchmark-imports
+
+Measures how long it takes to import the service entry points.
+
+Each module is imported in a fresh interpreter with `-X importtime`; the
+script reports the median wall time over several runs and the slowest
+imports (cumulative) of the last run, so cold-start regressions show up
+before they reach pm2 restarts or test runs.
+
+Run from the repository root:
+
+    python scripts/benchmark-imports.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmark_utils import apply_dummy_settings
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+DEFAULT_MODULES = ["common.commands", "bot_service", "api_service"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark service import time")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="imports per module")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports shown")
+    return parser.parse_args()
+
+
+def build_env() -> dict[str, str]:
+    """Dummy settings so the services can be imported without a real .env."""
+    env = os.environ.copy()
+    apply_dummy_settings(env)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_DIR), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def import_once(module: str, env: dict[str, str]) -> tuple[float, str]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def parse_importtime(output: str) -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) for every line of `-X importtime` output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def report(
+    module: str, timings: list[float], rows: list[tuple[int, int, str]], top: int
+):
+    own = next((cum for _, cum, name in rows if name.strip() == module), 0)
+    print(f"\n{module}")
+    print(
+        f"  wall time  median {statistics.median(timings) * 1000:8.1f} ms"
+        f"  min {min(timings) * 1000:8.1f} ms  ({len(timings)} runs)"
+    )
+    print(f"  import     {own / 1000:8.1f} ms  ({len(rows)} modules)")
+    print("  slowest imports (cumulative):")
+    # the slowest row is the module itself, reported above
+    slowest = sorted(rows, key=lambda r: r[1])[-top - 1 : -1]
+    for self_us, cumulative_us, name in reversed(slowest):
+        print(
+            f"    {cumulative_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {name}"
+        )
+
+
+def main():
+    args = parse_args()
+    env = build_env()
+    for module in args.modules:
+        timings, output = [], ""
+        for _ in range(args.runs):
+            elapsed, output = import_once(module, env)
+            timings.append(elapsed)
+        report(module, timings, parse_importtime(output), args.top)
+
+
+if __name__ == "__main__":
+    main()
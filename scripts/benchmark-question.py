@@ -0,0 +1,122 @@
+"""benchmark-question
+
+Compares the two query-understanding modes of the old RAG bot (`src/old`).
+
+`two-call` runs `extract_question` then `determine_subject`; `single-call`
+asks for the paraphrase and subjects in one structured response. With
+`--end-to-end` each run also does the vector search and streams the answer,
+reporting time to first answer token and total latency per mode.
+
+Needs the same environment as `src/old/main.py` (OpenAI key, Mongo URI).
+Run from the repository root:
+
+    python scripts/benchmark-question.py --runs 10 --end-to-end
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmark_utils import percentile
+
+DEFAULT_QUESTIONS = [
+    "why does my for loop print 5 five times with setTimeout",
+    "whats the difference between == and ===",
+    "how do i make a class inherit from another one",
+    "what does await do if the promise rejects",
+    "can i use import in a normal script tag",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark /question latency")
+    parser.add_argument("questions", nargs="*", default=DEFAULT_QUESTIONS)
+    parser.add_argument("--runs", type=int, default=5, help="passes over the questions")
+    parser.add_argument(
+        "--end-to-end",
+        action="store_true",
+        help="include vector search and answer streaming",
+    )
+    return parser.parse_args()
+
+
+async def run_once(
+    llm, mongo, db, subjects, question: str, single_call: bool, end_to_end: bool
+):
+    """(understanding, first token, total) latencies in seconds for one question."""
+    started = time.perf_counter()
+    analysis = await llm.understand_question(question, single_call=single_call)
+    understood = time.perf_counter() - started
+    if not end_to_end:
+        return understood, None, understood
+
+    context_docs = await mongo.vector_search(
+        db,
+        query=analysis.question,
+        subject_ids=[
+            str(subjects[s.value]) for s in analysis.subjects if s.value in subjects
+        ],
+    )
+    first_token = None
+    async for _ in llm.answer_question(analysis.question, context_docs):
+        if first_token is None:
+            first_token = time.perf_counter() - started
+    return understood, first_token, time.perf_counter() - started
+
+
+def report(mode: str, results: list[tuple[float, float | None, float]]):
+    print(f"\n{mode}")
+    columns = {
+        "understanding": [r[0] for r in results],
+        "first token": [r[1] for r in results if r[1] is not None],
+        "total": [r[2] for r in results],
+    }
+    for name, values in columns.items():
+        if not values:
+            continue
+        print(
+            f"  {name:<14} p50 {percentile(values, 50) * 1000:8.1f} ms"
+            f"  p95 {percentile(values, 95) * 1000:8.1f} ms"
+            f"  mean {statistics.fmean(values) * 1000:8.1f} ms"
+        )
+
+
+async def run(args):
+    import llm
+    import mongo
+
+    db, subjects = None, {}
+    if args.end_to_end:
+        _, db = mongo.connect()
+        subjects = {str(r["title"]): r["_id"] for r in await mongo.get_subjects(db)}
+
+    results = {"two-call": [], "single-call": []}
+    for _ in range(args.runs):
+        for question in args.questions:
+            # alternate modes so drift in provider latency hits both equally
+            for mode in results:
+                results[mode].append(
+                    await run_once(
+                        llm,
+                        mongo,
+                        db,
+                        subjects,
+                        question,
+                        mode == "single-call",
+                        args.end_to_end,
+                    )
+                )
+    return results
+
+
+def main():
+    args = parse_args()
+    sys.path.append("src/old")
+    for mode, results in asyncio.run(run(args)).items():
+        report(mode, results)
+
+
+if __name__ == "__main__":
+    main()
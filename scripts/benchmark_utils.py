@@ -0,0 +1,38 @@
+"""Helpers shared by the `benchmark-*` scripts."""
+
+from typing import MutableMapping
+
+# placeholders for the required settings, so the services load without a .env
+DUMMY_SETTINGS = {
+    "API_KEY": "benchmark",
+    "BOT_AT": "@benchmark_bot",
+    "BOT_URL": "https://t.me/benchmark_bot",
+    "LOGFIRE_LEVEL": "fatal",
+    "LOGFIRE_SEND_TO_LOGFIRE": "false",
+    "LOGFIRE_TOKEN": "",
+    "MONGO_DB": "",
+    "MONGO_URI": "",
+    "OPENAI_API_KEY": "",
+    "TELEGRAM_TOKEN": "123456:benchmark",
+    "WEB_API_KEY": "",
+    "WEB_API_URL": "http://127.0.0.1",
+    "WEB_ORIGIN": "http://127.0.0.1",
+}
+
+
+def apply_dummy_settings(env: MutableMapping[str, str]):
+    """Fill in `DUMMY_SETTINGS` where unset and keep the databases in memory."""
+    for key, value in DUMMY_SETTINGS.items():
+        env.setdefault(key, value)
+    env["JOB_DB_PATH"] = ":memory:"
+    env["IDEMPOTENCY_DB_PATH"] = ":memory:"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linearly interpolated percentile (numpy's default), 0 for no values."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
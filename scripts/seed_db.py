@@ -131,6 +131,7 @@ async def main():
 
     print("[cyan]seeding lecture_chunks[/cyan]")
     await chunk_and_embed(db, lecture_info)
+    await mongo.mark_seeded(db)
     print("[green]done 😊[/green]")
 
 
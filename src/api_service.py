@@ -1,26 +1,79 @@
-from fastapi import Depends, FastAPI, HTTPException, Security, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Response,
+    Security,
+    UploadFile,
+    status,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import cache, partial
+from telegram import error as tg_error
+from typing import Any, Awaitable, Callable, Iterable
 import asyncio
+import json
+import time
 
-from common.schema import TelegramMessage, InviteBatch, APIResponse
-from common.logging import get_api_logger
+from common.schema import (
+    APIResponse,
+    BroadcastRequest,
+    InviteBatch,
+    InviteRequest,
+    MessageBatch,
+    TelegramMessage,
+)
+from common import metrics
+from common.logging import logger, set_service
 from common.config import settings
 from common.bot import get_bot
+from common.idempotency import IdempotencyKeyReused, IdempotencyStore, fingerprint
+from common.invite_links import InviteLinkCache
+from common.jobs import JobRunner, JobStore
+from common.lazy import LazyObject
+from common.tasks import bounded_as_completed
 
 
-app = FastAPI()
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[settings.WEB_ORIGIN],
-    allow_credentials=True,
-    allow_methods=["POST"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_runner.start()
+    yield
+    await job_runner.stop()
 
-bot = get_bot()
-logger = get_api_logger(app)
+
+app = FastAPI(lifespan=lifespan)
+set_service("telegram-api")
+
+# nothing below reads settings or opens a database until it is first used
+bot = LazyObject(get_bot)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+idempotency_store = LazyObject(IdempotencyStore)
+invite_links = LazyObject(partial(InviteLinkCache, bot))
+job_store = LazyObject(JobStore)
+
+
+@cache
+def create_app() -> FastAPI:
+    """The app with CORS and logfire set up; uvicorn calls this with `--factory`.
+
+    Kept out of module scope so importing `api_service` reads no settings.
+    """
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[settings.WEB_ORIGIN],
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["*"],
+    )
+    logger.instrument_fastapi(app)
+    return app
 
 
 def get_api_key(api_key: str = Security(api_key_header)):
@@ -33,13 +86,30 @@ def get_api_key(api_key: str = Security(api_key_header)):
         )
 
 
-@app.post("/send-message", response_model=APIResponse, status_code=status.HTTP_200_OK)
-async def send_message(message: TelegramMessage, api_key: str = Depends(get_api_key)):
+async def _idempotent(
+    scope: str,
+    idempotency_key: str | None,
+    payload: Any,
+    fn: Callable[[], Awaitable[dict]],
+) -> dict:
+    if idempotency_key is None:
+        return await fn()
+    try:
+        return await idempotency_store.run(
+            f"{scope}:{idempotency_key}", fingerprint(payload), fn
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+
+
+async def _send_message(message: TelegramMessage) -> dict:
     try:
         logger.info(
             "Sending message to {chat_id=}",
             chat_id=message.chat_id,
-            message=message.message,
+            message_length=len(message.message),
         )
         await bot.send_message(chat_id=message.chat_id, text=message.message)
         return {"data": {"message": "Message sent successfully"}}
@@ -50,54 +120,310 @@ async def send_message(message: TelegramMessage, api_key: str = Depends(get_api_
         )
 
 
+@app.post("/send-message", response_model=APIResponse, status_code=status.HTTP_200_OK)
+async def send_message(
+    message: TelegramMessage,
+    idempotency_key: str | None = Header(None),
+    api_key: str = Depends(get_api_key),
+):
+    return await _idempotent(
+        "send-message",
+        idempotency_key,
+        message.model_dump(mode="json"),
+        partial(_send_message, message),
+    )
+
+
+async def _send_batch_message(index: int, message: TelegramMessage) -> dict:
+    try:
+        await bot.send_message(chat_id=message.chat_id, text=message.message)
+        return {"index": index, "status": "success", "chat_id": message.chat_id}
+    except Exception as e:
+        logger.error(
+            "Error sending message: {error=}", error=str(e), chat_id=message.chat_id
+        )
+        return {
+            "index": index,
+            "status": "error",
+            "chat_id": message.chat_id,
+            "error": str(e),
+        }
+
+
+async def _send_messages(message_batch: MessageBatch) -> dict:
+    results = [None] * len(message_batch.messages)
+    async for result in bounded_as_completed(
+        (
+            _send_batch_message(index, message)
+            for index, message in enumerate(message_batch.messages)
+        ),
+        settings.MAX_CONCURRENCY,
+    ):
+        results[result["index"]] = result
+
+    successful = sum(1 for res in results if res["status"] == "success")
+    return {
+        "message": f"Sent {successful} of {len(results)} messages successfully.",
+        "data": {
+            "successful": successful,
+            "failed": len(results) - successful,
+            "results": results,
+        },
+    }
+
+
+@app.post("/send-messages", response_model=APIResponse, status_code=status.HTTP_200_OK)
+async def send_messages(
+    message_batch: MessageBatch,
+    idempotency_key: str | None = Header(None),
+    api_key: str = Depends(get_api_key),
+):
+    return await _idempotent(
+        "send-messages",
+        idempotency_key,
+        message_batch.model_dump(mode="json"),
+        partial(_send_messages, message_batch),
+    )
+
+
+def _invite_message(message: str, invite_link: str) -> str:
+    return f"{message}\n\nJoin the group: {invite_link}"
+
+
+async def _send_invite(
+    invite_link: Awaitable[str], chat_id: str, user_id: str, message: str
+) -> dict:
+    try:
+        with metrics.INVITES_IN_FLIGHT.track_inprogress():
+            await bot.send_message(
+                chat_id=user_id, text=_invite_message(message, await invite_link)
+            )
+        return {"status": "success", "chat_id": chat_id, "user_id": user_id}
+    except Exception as e:
+        logger.error(
+            "Error sending invite: {error=}",
+            error=str(e),
+            user_id=user_id,
+            chat_id=chat_id,
+        )
+        return {
+            "status": "error",
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "error": str(e),
+        }
+
+
+def _invite_deliveries(invites: list[InviteRequest]):
+    for invite in invites:
+        if not invite.user_ids:
+            continue
+        # shared by every recipient of the invite, so a failing chat costs one call
+        invite_link = asyncio.ensure_future(
+            invite_links.get(invite.chat_id, uses=len(invite.user_ids))
+        )
+        for user_id in invite.user_ids:
+            yield _send_invite(invite_link, invite.chat_id, user_id, invite.message)
+
+
+async def _stream_invites(invites: list[InviteRequest]):
+    successful, failed = 0, 0
+    async for result in bounded_as_completed(
+        _invite_deliveries(invites), settings.MAX_CONCURRENCY
+    ):
+        if result["status"] == "success":
+            successful += 1
+        else:
+            failed += 1
+        yield json.dumps(result) + "\n"
+
+    yield (
+        json.dumps({"status": "complete", "successful": successful, "failed": failed})
+        + "\n"
+    )
+
+
+async def _send_invites(invite_batch: InviteBatch, background: bool) -> dict:
+    if background:
+        job_id = job_runner.submit(
+            "invites",
+            [
+                (invite.chat_id, user_id, invite.message)
+                for invite in invite_batch.invites
+                for user_id in invite.user_ids
+            ],
+        )
+        return {"message": "Invites queued", "data": {"job_id": job_id}}
+
+    successful, failed = [], []
+    async for result in bounded_as_completed(
+        _invite_deliveries(invite_batch.invites), settings.MAX_CONCURRENCY
+    ):
+        if result["status"] == "success":
+            successful.append(result)
+        else:
+            failed.append(result)
+
+    return {
+        "message": f"Processed {len(successful)} invites successfully, {len(failed)} failed.",
+        "data": {"successful": successful, "failed": failed},
+    }
+
+
 @app.post("/send-invites", response_model=APIResponse, status_code=status.HTTP_200_OK)
-async def send_invites(invite_batch: InviteBatch, api_key: str = Depends(get_api_key)):
-    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENCY)
+async def send_invites(
+    invite_batch: InviteBatch,
+    response: Response,
+    background: bool = False,
+    stream: bool = False,
+    idempotency_key: str | None = Header(None),
+    api_key: str = Depends(get_api_key),
+):
+    # streamed results can't be replayed, so idempotency keys don't apply here
+    if stream:
+        return StreamingResponse(
+            _stream_invites(invite_batch.invites), media_type="application/x-ndjson"
+        )
 
-    async def process_invite(invite):
-        async with semaphore:
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return await _idempotent(
+        "send-invites",
+        idempotency_key,
+        {"body": invite_batch.model_dump(mode="json"), "background": background},
+        partial(_send_invites, invite_batch, background),
+    )
+
+
+def _dedupe_chat_ids(chat_ids: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(c.strip() for c in chat_ids if c.strip()))
+
+
+async def _broadcast(message: str, chat_ids: list[str]) -> dict:
+    delivered, failed, blocked = 0, [], []
+
+    # each worker owns a fixed shard of the recipients and sends to it in order
+    async def worker(shard: list[str]):
+        nonlocal delivered
+        for chat_id in shard:
             try:
-                chat_invite_link = await bot.create_chat_invite_link(
-                    chat_id=invite.chat_id
-                )
-                invite_message = f"{invite.message}\n\nJoin the group: {chat_invite_link.invite_link}"
-                tasks = [
-                    bot.send_message(chat_id=user_id, text=invite_message)
-                    for user_id in invite.user_ids
-                ]
-                await asyncio.gather(*tasks)
-                return {"status": "success", "chat_id": invite.chat_id}
+                await bot.send_message(chat_id=chat_id, text=message)
+                delivered += 1
+            except tg_error.Forbidden:
+                blocked.append(chat_id)
             except Exception as e:
                 logger.error(
-                    "Error sending invite: {error=}",
+                    "Error broadcasting message: {error=}",
                     error=str(e),
-                    user_ids=invite.user_ids,
-                    chat_id=invite.chat_id,
+                    chat_id=chat_id,
                 )
-                raise {"status": "error", "chat_id": invite.chat_id, "error": str(e)}
+                failed.append(chat_id)
 
-    try:
-        results = await asyncio.gather(
-            *[process_invite(invite) for invite in invite_batch.invites]
+    workers = max(1, min(settings.BROADCAST_WORKERS, len(chat_ids)))
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(chat_ids[i::workers]) for i in range(workers)])
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "recipients": len(chat_ids),
+        "delivered": delivered,
+        "failed": len(failed),
+        "blocked": len(blocked),
+        "elapsed": round(elapsed, 3),
+        "msgs_per_sec": round(delivered / elapsed, 2) if elapsed else 0.0,
+    }
+    logger.info("Broadcast finished: {delivered=} {failed=} {blocked=}", **report)
+    return {
+        "message": f"Delivered {delivered} of {len(chat_ids)} messages.",
+        "data": {**report, "failed_chat_ids": failed, "blocked_chat_ids": blocked},
+    }
+
+
+@app.post("/broadcast", response_model=APIResponse, status_code=status.HTTP_200_OK)
+async def broadcast(
+    broadcast_request: BroadcastRequest,
+    idempotency_key: str | None = Header(None),
+    api_key: str = Depends(get_api_key),
+):
+    chat_ids = _dedupe_chat_ids(broadcast_request.chat_ids)
+    return await _idempotent(
+        "broadcast",
+        idempotency_key,
+        {"message": broadcast_request.message, "chat_ids": chat_ids},
+        partial(_broadcast, broadcast_request.message, chat_ids),
+    )
+
+
+@app.post(
+    "/broadcast/upload", response_model=APIResponse, status_code=status.HTTP_200_OK
+)
+async def broadcast_upload(
+    message: str = Form(...),
+    recipients: UploadFile = File(
+        ..., description="Chat IDs separated by newlines, commas or whitespace"
+    ),
+    idempotency_key: str | None = Header(None),
+    api_key: str = Depends(get_api_key),
+):
+    content = (await recipients.read()).decode("utf-8")
+    chat_ids = _dedupe_chat_ids(content.replace(",", " ").split())
+    return await _idempotent(
+        "broadcast",
+        idempotency_key,
+        {"message": message, "chat_ids": chat_ids},
+        partial(_broadcast, message, chat_ids),
+    )
+
+
+# ---[Background Jobs]-------------------------------------------------------------
+
+
+async def deliver_invite_job(job_id: str):
+    items = job_store.pending_items(job_id)
+
+    recipients = Counter(item["chat_id"] for item in items)
+    chat_links = {
+        chat_id: asyncio.ensure_future(invite_links.get(chat_id, uses=uses))
+        for chat_id, uses in recipients.items()
+    }
+
+    async def deliver(item):
+        result = await _send_invite(
+            chat_links[item["chat_id"]],
+            item["chat_id"],
+            item["user_id"],
+            item["message"],
         )
-        successful = [res for res in results if res["status"] == "success"]
-        failed = [res for res in results if res["status"] == "error"]
+        if result["status"] == "success":
+            job_store.mark_item(job_id, item["idx"], "delivered")
+        else:
+            job_store.mark_item(job_id, item["idx"], "failed", result["error"])
 
-        return {
-            "message": f"Processed {len(successful)} invites successfully, {len(failed)} failed.",
-            "data": {"successful": successful, "failed": failed},
-        }
-    except Exception as e:
-        logger.error("Error sending invites: {error=}", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
-        await bot.send_message(
-            chat_id=invite.user_id, 
-            text="""\
-Unfortunately, we weren't able to generate your invite. Please make sure you've followed all the instructions on our website here: wazobiacode.com/faq, then try again.
-
-If you still do not receive an invite, please reach out to us via email here wazobiacode@gmail.com.
-"""
+    async for _ in bounded_as_completed(
+        (deliver(item) for item in items), settings.MAX_CONCURRENCY
+    ):
+        pass
+
+
+job_runner = LazyObject(
+    partial(JobRunner, job_store, handlers={"invites": deliver_invite_job})
+)
+
+
+@app.get("/jobs/{job_id}", response_model=APIResponse, status_code=status.HTTP_200_OK)
+async def get_job(job_id: str, api_key: str = Depends(get_api_key)):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
+    return {"data": job}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
 
 
 @app.get("/health", status_code=status.HTTP_200_OK)
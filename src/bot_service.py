@@ -1,6 +1,7 @@
 from telegram.ext import CommandHandler, ConversationHandler, filters, MessageHandler
 
 from time import strftime
+import asyncio
 
 from common.commands import (
     cancel_registration,
@@ -11,7 +12,9 @@ from common.commands import (
     unknown,
     RegistrationStates,
 )
+from common.config import settings
 from common.logging import bot_logger
+from common.metrics import start_exporter
 from common.bot import get_application
 
 
@@ -27,6 +30,8 @@ def main():
             RegistrationStates.PHONE: [MessageHandler(filters.CONTACT, receive_phone)]
         },
         fallbacks=[CommandHandler("cancel", cancel_registration)],
+        name="registration",
+        persistent=True,
     )
     app.add_handler(conv_handler)
 
@@ -36,9 +41,19 @@ def main():
     unknown_handler = MessageHandler(filters.COMMAND, unknown)
     app.add_handler(unknown_handler)
 
+    if settings.BOT_METRICS_PORT:
+        start_exporter(settings.BOT_METRICS_PORT, app.update_queue)
+
     start_time = strftime("%Y%m%d_%H:%M:%S")
     with bot_logger.span(f"bot started at {start_time}"):
-        app.run_polling()
+        if settings.TELEGRAM_WEBHOOK_URL:
+            # keeps fastapi and uvicorn out of polling-mode startup
+            from common.webhook import run_webhook
+
+            bot_logger.info("receiving updates via webhook")
+            asyncio.run(run_webhook(app))
+        else:
+            app.run_polling()
         end_time = strftime("%Y%m%d_%H:%M:%S")
         bot_logger.info(f"bot stopped at {end_time}")
 
@@ -1,12 +1,37 @@
-from telegram.ext import ApplicationBuilder
+from functools import cache
+
+from telegram import Bot
+from telegram.ext import Application, ApplicationBuilder
+from common import web_client
 from common.config import settings
+from common.persistence import SQLitePersistence
+from common.rate_limiter import TelegramRateLimiter
+from common.update_processor import PerChatUpdateProcessor
+
+
+async def _post_init(application: Application):
+    await web_client.open_client()
+
 
-application = ApplicationBuilder().token(settings.TELEGRAM_TOKEN).build()
+async def _post_shutdown(application: Application):
+    await web_client.close_client()
 
 
-def get_application():
-    return application
+@cache
+def get_application() -> Application:
+    """Build the Application on first use, so importing this module stays cheap."""
+    return (
+        ApplicationBuilder()
+        .token(settings.TELEGRAM_TOKEN)
+        .base_url(settings.TELEGRAM_BASE_URL)
+        .rate_limiter(TelegramRateLimiter())
+        .concurrent_updates(PerChatUpdateProcessor(settings.BOT_CONCURRENT_UPDATES))
+        .persistence(SQLitePersistence())
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
 
-def get_bot():
-    return application.bot
+def get_bot() -> Bot:
+    return get_application().bot
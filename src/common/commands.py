@@ -14,6 +14,7 @@ from telegram.ext import ContextTypes, ConversationHandler
 from common import web_client
 from common.config import settings
 from common.logging import bot_logger
+from common.metrics import track_handler
 from common.schema import ChatData
 
 
@@ -38,21 +39,24 @@ def _get_chat_data(update: Update) -> ChatData:
 # ---[General Commands]-------------------------------------------------------------
 
 
+@track_handler
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_data = _get_chat_data(update)
 
-    bot_logger.debug(
-        "Bot started: {sender=}",
-        sender=chat_data.sender,
-        sent_by=chat_data.sent_by,
-        chat_id=chat_data.chat_id,
-    )
+    if bot_logger.is_enabled("debug"):
+        bot_logger.debug(
+            "Bot started: {sender=}",
+            sender=chat_data.sender,
+            sent_by=chat_data.sent_by,
+            chat_id=chat_data.chat_id,
+        )
     await context.bot.send_message(
         chat_id=chat_data.chat_id,
         text="Welcome to the WazobiaCode Bootcamp Bot! I'm here to assist you with your registration and provide access to course materials. To get started, use /register to link your Telegram account. If you need any help, just type /help for a list of available commands.",
     )
 
 
+@track_handler
 async def help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_data = _get_chat_data(update)
 
@@ -65,25 +69,28 @@ Available commands:
 For any issues or questions, please contact support.
     """
 
-    bot_logger.debug(
-        "Help command requested: {sender=}",
-        sender=chat_data.sender,
-        sent_by=chat_data.sent_by,
-        chat_id=chat_data.chat_id,
-    )
+    if bot_logger.is_enabled("debug"):
+        bot_logger.debug(
+            "Help command requested: {sender=}",
+            sender=chat_data.sender,
+            sent_by=chat_data.sent_by,
+            chat_id=chat_data.chat_id,
+        )
     await context.bot.send_message(chat_id=chat_data.chat_id, text=help_text)
 
 
+@track_handler
 async def unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_data = _get_chat_data(update)
 
-    bot_logger.debug(
-        "Unknown command: {text=}",
-        text=chat_data.text,
-        sender=chat_data.sender,
-        sent_by=chat_data.sent_by,
-        chat_id=chat_data.chat_id,
-    )
+    if bot_logger.is_enabled("debug"):
+        bot_logger.debug(
+            "Unknown command: {text=}",
+            text=chat_data.text,
+            sender=chat_data.sender,
+            sent_by=chat_data.sent_by,
+            chat_id=chat_data.chat_id,
+        )
     await context.bot.send_message(
         chat_id=chat_data.chat_id,
         text="Sorry, I don't know that command. Use /help to see a list of available commands.",
@@ -97,6 +104,7 @@ class RegistrationStates(Enum):
     PHONE = 0
 
 
+@track_handler
 async def register_user(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> RegistrationStates:
@@ -106,12 +114,13 @@ async def register_user(
     reply_markup = ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
 
     try:
-        bot_logger.debug(
-            "Sending registration message: {sender=}",
-            sender=chat_data.sender,
-            sent_by=chat_data.sent_by,
-            chat_id=chat_data.chat_id,
-        )
+        if bot_logger.is_enabled("debug"):
+            bot_logger.debug(
+                "Sending registration message: {sender=}",
+                sender=chat_data.sender,
+                sent_by=chat_data.sent_by,
+                chat_id=chat_data.chat_id,
+            )
         await update.message.reply_text(
             """\
 Welcome to the WazobiaCode Bootcamp!
@@ -140,6 +149,7 @@ Please reach out to <a href="{settings.BOT_URL}">{settings.BOT_AT}</a>
     return RegistrationStates.PHONE
 
 
+@track_handler
 async def receive_phone(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> RegistrationStates:
@@ -157,29 +167,32 @@ async def receive_phone(
         )
         return ConversationHandler.END
 
-    bot_logger.debug(
-        "Received phone number: {sender=}",
-        phone_number=phone_number,
-        sender=chat_data.sender,
-        sent_by=chat_data.sent_by,
-        chat_id=chat_data.chat_id,
-    )
+    if bot_logger.is_enabled("debug"):
+        bot_logger.debug(
+            "Received phone number: {sender=}",
+            phone_number=phone_number,
+            sender=chat_data.sender,
+            sent_by=chat_data.sent_by,
+            chat_id=chat_data.chat_id,
+        )
     await update.message.reply_text(res.message, reply_markup=ReplyKeyboardRemove())
 
     return ConversationHandler.END
 
 
+@track_handler
 async def cancel_registration(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> RegistrationStates:
     chat_data = _get_chat_data(update)
 
-    bot_logger.debug(
-        "Cancelling registration: {sender=}",
-        sender=chat_data.sender,
-        sent_by=chat_data.sent_by,
-        chat_id=chat_data.chat_id,
-    )
+    if bot_logger.is_enabled("debug"):
+        bot_logger.debug(
+            "Cancelling registration: {sender=}",
+            sender=chat_data.sender,
+            sent_by=chat_data.sent_by,
+            chat_id=chat_data.chat_id,
+        )
     await update.message.reply_text(
         "Registration cancelled. You can start over by using the /register command.",
         reply_markup=ReplyKeyboardRemove(),
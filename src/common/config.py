@@ -1,20 +1,66 @@
+from functools import cache
+
 from pydantic_settings import BaseSettings
 
+from common.lazy import LazyObject
+
 
 class Settings(BaseSettings):
     API_KEY: str
     BOT_AT: str
+    BOT_CONCURRENT_UPDATES: int = 32
+    BOT_METRICS_PORT: int = 9101
+    BOT_PERSISTENCE_INTERVAL: float = 5.0
+    BOT_PERSISTENCE_PATH: str = "bot_state.db"
     BOT_URL: str
+    BROADCAST_WORKERS: int = 10
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_DB_PATH: str = "idempotency.db"
+    IDEMPOTENCY_PENDING_TIMEOUT: float = 600.0
+    IDEMPOTENCY_TTL: float = 24 * 60 * 60
+    INVITE_LINK_CACHE_SIZE: int = 1024
+    INVITE_LINK_TTL: float = 3600.0
+    JOB_DB_PATH: str = "jobs.db"
+    JOB_LEASE_SECONDS: float = 30.0
+    JOB_WORKERS: int = 2
+    LOGFIRE_EXPORT_DELAY_MS: int = 1000
     LOGFIRE_LEVEL: str
+    LOGFIRE_QUEUE_SIZE: int = 2048
+    LOGFIRE_SAMPLE_RATES: dict[str, float] = {}
     LOGFIRE_TOKEN: str
     MAX_CONCURRENCY: int = 10
     MONGO_DB: str
     MONGO_URI: str
     OPENAI_API_KEY: str
+    REGISTRATION_CACHE_SIZE: int = 10000
+    REGISTRATION_CACHE_TTL: float = 7 * 24 * 60 * 60
+    TELEGRAM_BASE_URL: str = "https://api.telegram.org/bot"
+    TELEGRAM_CHAT_RATE: float = 1.0
+    TELEGRAM_GLOBAL_RATE: float = 30.0
+    TELEGRAM_GROUP_RATE: float = 20 / 60
+    TELEGRAM_MAX_RETRIES: int = 3
+    TELEGRAM_RATE_LIMIT_DB: str | None = None
     TELEGRAM_TOKEN: str
+    TELEGRAM_WEBHOOK_PORT: int = 8001
+    TELEGRAM_WEBHOOK_SECRET: str | None = None
+    TELEGRAM_WEBHOOK_URL: str | None = None
+    WEB_API_BREAKER_RESET: float = 30.0
+    WEB_API_BREAKER_THRESHOLD: int = 5
+    WEB_API_BUDGET: float = 8.0
+    WEB_API_CONNECT_TIMEOUT: float = 5.0
+    WEB_API_HTTP2: bool = False
     WEB_API_KEY: str
+    WEB_API_MAX_CONNECTIONS: int = 20
+    WEB_API_RETRIES: int = 2
+    WEB_API_TIMEOUT: float = 10.0
     WEB_API_URL: str
     WEB_ORIGIN: str
 
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+# read from the environment on first use, not on import
+settings = LazyObject(get_settings)
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from common.cache import SingleFlight, TTLCache
+from common.config import settings
+from common.sqlite import connect
+
+_POLL_INTERVAL = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response TEXT,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class IdempotencyKeyReused(Exception):
+    pass
+
+
+def fingerprint(payload: Any) -> str:
+    """Hash of a request payload, so a reused key with a different body is caught."""
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Remembers responses by idempotency key so retried requests are not re-run.
+
+    Responses are kept in an in-memory LRU+TTL cache, backed by a SQLite
+    database shared by every uvicorn worker on the host. A key is claimed with
+    a pending row before the request runs, so a duplicate arriving on any
+    worker waits for the original's result instead of running again. Claims
+    of a worker that died are taken over after `pending_timeout` seconds.
+    Failed calls (exceptions) release the key, so they can be retried.
+
+    Each key is bound to the fingerprint of its first request; reusing it for
+    a different request raises `IdempotencyKeyReused`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        ttl: float | None = None,
+        db_path: str | None = None,
+        pending_timeout: float | None = None,
+    ):
+        self.ttl = ttl or settings.IDEMPOTENCY_TTL
+        self.pending_timeout = pending_timeout or settings.IDEMPOTENCY_PENDING_TIMEOUT
+        self._cache: TTLCache[str, tuple[str, dict]] = TTLCache(
+            maxsize or settings.IDEMPOTENCY_CACHE_SIZE, self.ttl
+        )
+        db_path = db_path or settings.IDEMPOTENCY_DB_PATH
+        self._inflight: SingleFlight[str] = SingleFlight()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = connect(db_path, _SCHEMA)
+            self._db.execute(
+                "DELETE FROM idempotency_keys WHERE expires_at < ?", (time.time(),)
+            )
+
+    def _check(self, key: str, fingerprint: str, stored: str):
+        if stored != fingerprint:
+            raise IdempotencyKeyReused(
+                f"Idempotency key {key!r} was already used for a different request"
+            )
+
+    def _claim(self, key: str, fingerprint: str) -> tuple[bool, dict | None]:
+        """Claim `key` in the database.
+
+        Returns `(True, None)` if this worker now owns the key, or
+        `(False, response)` if another request holds it; `response` is None
+        while that request is still running.
+        """
+        with self._lock:
+            now = time.time()
+            self._db.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND expires_at < ?",
+                (key, now),
+            )
+            claimed = self._db.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, response, expires_at) "
+                "VALUES (?, ?, NULL, ?)",
+                (key, fingerprint, now + self.pending_timeout),
+            ).rowcount
+            if claimed:
+                return True, None
+
+            row = self._db.execute(
+                "SELECT fingerprint, response, expires_at FROM idempotency_keys WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            # released between the insert and the select; try again
+            return self._claim(key, fingerprint)
+
+        self._check(key, fingerprint, row[0])
+        if row[1] is None:
+            return False, None
+        response = json.loads(row[1])
+        self._cache.set(key, (fingerprint, response), ttl=row[2] - now)
+        return False, response
+
+    def _complete(self, key: str, response: dict):
+        with self._lock:
+            self._db.execute(
+                "UPDATE idempotency_keys SET response = ?, expires_at = ? WHERE key = ?",
+                (json.dumps(response), time.time() + self.ttl, key),
+            )
+
+    def _release(self, key: str):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND response IS NULL",
+                (key,),
+            )
+
+    async def run(
+        self, key: str, fingerprint: str, fn: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Return the stored response for `key`, or run `fn` once and store its result."""
+        cached = self._cache.get(key)
+        if cached is None:
+            # callers in this process share one claim; a mismatched one is only
+            # caught once the shared call returns
+            cached = await self._inflight.do(
+                key, partial(self._run, key, fingerprint, fn)
+            )
+        self._check(key, fingerprint, cached[0])
+        return cached[1]
+
+    async def _run(
+        self, key: str, fingerprint: str, fn: Callable[[], Awaitable[dict]]
+    ) -> tuple[str, dict]:
+        if self._db is None:
+            response = await fn()
+            self._cache.set(key, (fingerprint, response))
+            return fingerprint, response
+
+        while True:
+            owned, response = await asyncio.to_thread(self._claim, key, fingerprint)
+            if owned:
+                break
+            if response is not None:
+                return fingerprint, response
+            await asyncio.sleep(_POLL_INTERVAL)
+
+        try:
+            response = await fn()
+        except BaseException:
+            await asyncio.to_thread(self._release, key)
+            raise
+        await asyncio.to_thread(self._complete, key, response)
+        self._cache.set(key, (fingerprint, response))
+        return fingerprint, response
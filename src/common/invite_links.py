@@ -0,0 +1,68 @@
+import time
+from functools import partial
+
+from telegram import Bot, ChatInviteLink
+
+from common.cache import SingleFlight, TTLCache
+from common.config import settings
+
+# stop handing out links this many seconds before telegram expires them
+_EXPIRY_MARGIN = 60
+
+
+class _CachedLink:
+    __slots__ = ("link", "uses")
+
+    def __init__(self, link: ChatInviteLink):
+        self.link = link
+        self.uses = 0
+
+    def has_room(self, uses: int) -> bool:
+        limit = self.link.member_limit
+        return limit is None or self.uses + uses <= limit
+
+
+class InviteLinkCache:
+    """Reuses chat invite links across invites and requests.
+
+    Links are cached per `chat_id` with LRU+TTL eviction, dropped before their
+    `expire_date` and once their `member_limit` has been handed out. Concurrent
+    requests for the same chat share a single `create_chat_invite_link` call.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        maxsize: int | None = None,
+        ttl: float | None = None,
+    ):
+        self.bot = bot
+        self._links: TTLCache[str, _CachedLink] = TTLCache(
+            maxsize or settings.INVITE_LINK_CACHE_SIZE, ttl or settings.INVITE_LINK_TTL
+        )
+        self._inflight: SingleFlight[str] = SingleFlight()
+
+    async def get(self, chat_id: str, uses: int = 1) -> str:
+        """Return an invite link for `chat_id` that will be sent to `uses` users."""
+        chat_id = str(chat_id)
+        cached = self._links.get(chat_id)
+        if cached is None or not cached.has_room(uses):
+            self._links.pop(chat_id)
+            cached = await self._inflight.do(chat_id, partial(self._create, chat_id))
+
+        cached.uses += uses
+        return cached.link.invite_link
+
+    def invalidate(self, chat_id: str):
+        self._links.pop(str(chat_id))
+
+    async def _create(self, chat_id: str) -> _CachedLink:
+        link = await self.bot.create_chat_invite_link(chat_id=chat_id)
+        cached = _CachedLink(link)
+
+        ttl = self._links.ttl
+        if link.expire_date is not None:
+            ttl = min(ttl, link.expire_date.timestamp() - time.time() - _EXPIRY_MARGIN)
+        if ttl > 0:
+            self._links.set(chat_id, cached, ttl=ttl)
+        return cached
@@ -0,0 +1,232 @@
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Awaitable, Callable
+
+from common import metrics
+from common.config import settings
+from common.logging import logger
+from common.sqlite import connect
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    heartbeat REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    chat_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_items_status ON job_items (job_id, status);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, heartbeat);
+"""
+
+
+class JobStore:
+    """Durable job/recipient state in a local SQLite database (WAL mode).
+
+    The database is shared by every uvicorn worker on the host, so jobs are
+    leased to an owner process and re-claimed once the owner stops heartbeating.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.conn = connect(path or settings.JOB_DB_PATH, _SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def close(self):
+        self.conn.close()
+
+    def create_job(
+        self, kind: str, items: list[tuple[str, str, str]], owner: str
+    ) -> str:
+        """Create a job from `(chat_id, user_id, message)` items."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, owner, heartbeat, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, owner, now, now, now),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, chat_id, user_id, message) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((job_id, idx, *item) for idx, item in enumerate(items)),
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> dict | None:
+        job = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+
+        counts = {"pending": 0, "delivered": 0, "failed": 0}
+        for row in self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM job_items WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        ):
+            counts[row["status"]] = row["n"]
+        failures = [
+            dict(row)
+            for row in self.conn.execute(
+                "SELECT chat_id, user_id, error FROM job_items "
+                "WHERE job_id = ? AND status = 'failed' ORDER BY idx",
+                (job_id,),
+            )
+        ]
+
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "error": job["error"],
+            "total": sum(counts.values()),
+            **counts,
+            "failures": failures,
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    def pending_items(self, job_id: str) -> list[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT idx, chat_id, user_id, message FROM job_items "
+            "WHERE job_id = ? AND status = 'pending' ORDER BY idx",
+            (job_id,),
+        ).fetchall()
+
+    def mark_item(self, job_id: str, idx: int, status: str, error: str | None = None):
+        self.conn.execute(
+            "UPDATE job_items SET status = ?, error = ? WHERE job_id = ? AND idx = ?",
+            (status, error, job_id, idx),
+        )
+
+    def set_status(self, job_id: str, status: str, error: str | None = None):
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id),
+        )
+
+    def heartbeat(self, owner: str):
+        self.conn.execute(
+            f"UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN {ACTIVE_STATUSES}",
+            (time.time(), owner),
+        )
+
+    def release(self, owner: str):
+        """Expire `owner`'s leases so another process can resume its jobs immediately."""
+        self.conn.execute(
+            f"UPDATE jobs SET heartbeat = 0 WHERE owner = ? AND status IN {ACTIVE_STATUSES}",
+            (owner,),
+        )
+
+    def claim_stale(self, owner: str, lease: float) -> list[sqlite3.Row]:
+        """Take over active jobs whose owner has not heartbeated within `lease` seconds."""
+        now = time.time()
+        with self._transaction() as conn:
+            stale = conn.execute(
+                f"SELECT id, kind FROM jobs WHERE status IN {ACTIVE_STATUSES} "
+                "AND heartbeat < ? ORDER BY created_at",
+                (now - lease,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET owner = ?, heartbeat = ? WHERE id = ?",
+                ((owner, now, row["id"]) for row in stale),
+            )
+        return stale
+
+
+JobHandler = Callable[[str], Awaitable[None]]
+
+
+class JobRunner:
+    """Runs queued jobs on a fixed pool of asyncio worker tasks."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: dict[str, JobHandler],
+        workers: int | None = None,
+        lease: float | None = None,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers or settings.JOB_WORKERS
+        self.lease = lease or settings.JOB_LEASE_SECONDS
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._monitor()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.release(self.owner)
+
+    def submit(self, kind: str, items: list[tuple[str, str, str]]) -> str:
+        job_id = self.store.create_job(kind, items, self.owner)
+        self._enqueue(job_id, kind)
+        return job_id
+
+    def _enqueue(self, job_id: str, kind: str):
+        self._queue.put_nowait((job_id, kind))
+        metrics.JOB_QUEUE_DEPTH.inc()
+
+    async def _worker(self):
+        while True:
+            job_id, kind = await self._queue.get()
+            metrics.JOB_QUEUE_DEPTH.dec()
+            try:
+                self.store.set_status(job_id, "running")
+                await self.handlers[kind](job_id)
+                self.store.set_status(job_id, "completed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Job failed: {job_id=}", job_id=job_id, kind=kind, error=str(e)
+                )
+                self.store.set_status(job_id, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _monitor(self):
+        while True:
+            self.store.heartbeat(self.owner)
+            for job in self.store.claim_stale(self.owner, self.lease):
+                logger.info(
+                    "Resuming job: {job_id=}", job_id=job["id"], kind=job["kind"]
+                )
+                self._enqueue(job["id"], job["kind"])
+            await asyncio.sleep(self.lease / 3)
@@ -0,0 +1,25 @@
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyObject(Generic[T]):
+    """Stands in for an object that is only built on first attribute access.
+
+    Lets modules keep a module-level singleton (`settings`, `bot_logger`, ...)
+    without paying for it at import time.
+    """
+
+    __slots__ = ("_factory", "_target")
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._target: T | None = None
+
+    def _resolve(self) -> T:
+        if self._target is None:
+            self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
@@ -1,27 +1,111 @@
-from fastapi import FastAPI
+import random
+from functools import cache
 
 from common.config import settings
+from common.lazy import LazyObject
 
+# mirrors logfire's level numbers
+LEVELS = {
+    "trace": 1,
+    "debug": 5,
+    "info": 9,
+    "notice": 10,
+    "warn": 13,
+    "warning": 13,
+    "error": 17,
+    "fatal": 21,
+}
 
-def _get_logger(service_name: str):
+
+class Logger:
+    """Thin front for logfire that drops events before doing any work.
+
+    Events below `min_level` return immediately, and events listed in
+    `sample_rates` (keyed by message template) are only kept with the given
+    probability. Anything else (spans, instrumentation) goes straight to logfire.
+    """
+
+    __slots__ = ("_logfire", "_min_level", "_sample_rates")
+
+    def __init__(self, logfire, min_level: str, sample_rates: dict[str, float]):
+        self._logfire = logfire
+        self._min_level = LEVELS[min_level.lower()]
+        self._sample_rates = sample_rates
+
+    def __getattr__(self, name: str):
+        return getattr(self._logfire, name)
+
+    def is_enabled(self, level: str) -> bool:
+        """Guard for log calls whose attributes are not free to build."""
+        return LEVELS[level] >= self._min_level
+
+    def _keep(self, level: int, msg_template: str) -> bool:
+        if level < self._min_level:
+            return False
+        rate = self._sample_rates.get(msg_template)
+        return rate is None or random.random() < rate
+
+    def debug(self, msg_template: str, **attributes):
+        if self._keep(LEVELS["debug"], msg_template):
+            self._logfire.debug(msg_template, **attributes)
+
+    def info(self, msg_template: str, **attributes):
+        if self._keep(LEVELS["info"], msg_template):
+            self._logfire.info(msg_template, **attributes)
+
+    def warn(self, msg_template: str, **attributes):
+        if self._keep(LEVELS["warn"], msg_template):
+            self._logfire.warn(msg_template, **attributes)
+
+    def error(self, msg_template: str, **attributes):
+        if self._keep(LEVELS["error"], msg_template):
+            self._logfire.error(msg_template, **attributes)
+
+
+def _get_logger(service_name: str) -> Logger:
     import logfire
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
     logfire.configure(
         service_name=service_name,
         token=settings.LOGFIRE_TOKEN,
         console=logfire.ConsoleOptions(min_log_level=settings.LOGFIRE_LEVEL),
+        default_span_processor=lambda exporter: BatchSpanProcessor(
+            exporter,
+            max_queue_size=settings.LOGFIRE_QUEUE_SIZE,
+            schedule_delay_millis=settings.LOGFIRE_EXPORT_DELAY_MS,
+        ),
     )
-    return logfire
+    return Logger(logfire, settings.LOGFIRE_LEVEL, settings.LOGFIRE_SAMPLE_RATES)
 
 
-def get_api_logger(fastapi_app: FastAPI):
-    logger = _get_logger("telegram-api")
-    logger.instrument_fastapi(fastapi_app)
-    return logger
+@cache
+def get_api_logger():
+    return _get_logger("telegram-api")
 
 
+@cache
 def get_bot_logger():
     return _get_logger("telegram-bot")
 
 
-bot_logger = get_bot_logger()
+# logfire is only configured for the bot service once something is logged
+bot_logger = LazyObject(get_bot_logger)
+
+_service_name = "telegram-bot"
+
+
+def set_service(service_name: str):
+    """Select the service `logger` logs as; call before anything is logged."""
+    global _service_name
+    _service_name = service_name
+
+
+def get_logger() -> Logger:
+    if _service_name == "telegram-api":
+        return get_api_logger()
+    return get_bot_logger()
+
+
+# for code shared by both services, logs as whichever one runs in this process
+logger = LazyObject(get_logger)
@@ -0,0 +1,100 @@
+import functools
+import os
+from typing import Awaitable, Callable, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+T = TypeVar("T")
+
+# Telegram responds in tens of milliseconds; long tails come from retries and 429s
+_LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# ---[Telegram Bot API]-------------------------------------------------------------
+
+TELEGRAM_REQUEST_SECONDS = Histogram(
+    "telegram_request_duration_seconds",
+    "Latency of Telegram Bot API calls, excluding rate-limiter waits.",
+    ["method"],
+    buckets=_LATENCY_BUCKETS,
+)
+TELEGRAM_REQUESTS = Counter(
+    "telegram_requests_total",
+    "Telegram Bot API calls by outcome (ok, error, retry_after).",
+    ["method", "outcome"],
+)
+TELEGRAM_IN_FLIGHT = Gauge(
+    "telegram_requests_in_flight",
+    "Telegram Bot API calls currently waiting for a response.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# ---[API Service]------------------------------------------------------------------
+
+INVITES_IN_FLIGHT = Gauge(
+    "invites_in_flight",
+    "Invite deliveries currently holding a MAX_CONCURRENCY slot.",
+    multiprocess_mode="livesum",
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Background jobs waiting for a worker.",
+    multiprocess_mode="livesum",
+)
+
+# ---[Bot Service]------------------------------------------------------------------
+
+HANDLER_SECONDS = Histogram(
+    "bot_handler_duration_seconds",
+    "Time spent in each bot command handler.",
+    ["handler"],
+    buckets=_LATENCY_BUCKETS,
+)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total",
+    "Bot command handlers that raised.",
+    ["handler"],
+)
+UPDATE_QUEUE_DEPTH = Gauge(
+    "bot_update_queue_depth",
+    "Updates received from Telegram and not yet dispatched.",
+)
+
+
+def track_handler(handler: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Record latency and errors of a bot handler under its function name."""
+    name = handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs) -> T:
+        with HANDLER_SECONDS.labels(name).time():
+            with HANDLER_ERRORS.labels(name).count_exceptions():
+                return await handler(*args, **kwargs)
+
+    return wrapper
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition body and content type, aggregated over uvicorn workers if needed."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port: int, update_queue=None):
+    """Serve /metrics for the bot process from a background thread."""
+    if update_queue is not None:
+        UPDATE_QUEUE_DEPTH.set_function(update_queue.qsize)
+    start_http_server(port, addr="127.0.0.1")
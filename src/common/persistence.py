@@ -0,0 +1,137 @@
+import asyncio
+import json
+import pickle
+import sqlite3
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from common.config import settings
+from common.sqlite import connect
+
+ConversationKey = tuple[int | str, ...]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (name, key)
+);
+"""
+
+
+class SQLitePersistence(BasePersistence):
+    """Persists ConversationHandler states to a local SQLite file.
+
+    Writes are behind: the application hands over changed states every
+    `update_interval` seconds and they are written in a single transaction off
+    the event loop. Only conversations are stored; user/chat/bot data are not.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        update_interval: float | None = None,
+    ):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=False, callback_data=False
+            ),
+            update_interval=update_interval or settings.BOT_PERSISTENCE_INTERVAL,
+        )
+        self.path = path or settings.BOT_PERSISTENCE_PATH
+        self._conn: sqlite3.Connection | None = None
+        self._pending: dict[tuple[str, str], object | None] = {}
+        self._write_task: asyncio.Task | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect(self.path, _SCHEMA, isolation_level="")
+        return self._conn
+
+    def _write(self, pending: dict[tuple[str, str], object | None]):
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "DELETE FROM conversations WHERE name = ? AND key = ?",
+                (key for key, state in pending.items() if state is None),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO conversations (name, key, state) VALUES (?, ?, ?)",
+                (
+                    (*key, pickle.dumps(state))
+                    for key, state in pending.items()
+                    if state is not None
+                ),
+            )
+
+    def _take_pending(self) -> dict[tuple[str, str], object | None]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    async def _write_pending(self):
+        # yield once so every state handed over in this persistence cycle is batched
+        await asyncio.sleep(0)
+        while self._pending:
+            await asyncio.to_thread(self._write, self._take_pending())
+
+    async def get_conversations(self, name: str) -> dict[ConversationKey, object]:
+        rows = self._connect().execute(
+            "SELECT key, state FROM conversations WHERE name = ?", (name,)
+        )
+        return {tuple(json.loads(key)): pickle.loads(state) for key, state in rows}
+
+    async def update_conversation(
+        self, name: str, key: ConversationKey, new_state: object | None
+    ) -> None:
+        self._pending[(name, json.dumps(key))] = new_state
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_pending())
+
+    async def flush(self) -> None:
+        if self._write_task is not None:
+            await self._write_task
+        if self._pending:
+            self._write(self._take_pending())
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def get_user_data(self) -> dict:
+        return {}
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data: object) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def drop_user_data(self, user_id: int) -> None:
+        pass
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
@@ -0,0 +1,287 @@
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, Callable, Coroutine
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from common import metrics
+from common.config import settings
+from common.logging import logger
+from common.sqlite import connect
+
+# endpoints that count against telegram's per-chat message limits
+_MESSAGE_ENDPOINT_PREFIXES = ("send", "copyMessage", "forwardMessage")
+_MAX_IDLE_LANES = 512
+
+
+class TokenBucket:
+    """Paces callers to `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    async def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def is_idle(self) -> bool:
+        now = time.monotonic()
+        self._refill(now)
+        return (
+            self.tokens >= self.capacity
+            and now >= self.paused_until
+            and not self._lock.locked()
+        )
+
+    async def acquire(self):
+        # the lock queues waiters in FIFO order, so callers are released one token
+        # at a time instead of all waking up together and bursting
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    paused_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class BucketStore:
+    """Token bucket state in a SQLite database shared by every process on the host.
+
+    All reads and updates of a bucket happen inside one `BEGIN IMMEDIATE`
+    transaction, so concurrent processes never spend the same token twice.
+    """
+
+    def __init__(self, path: str):
+        self.conn = connect(path, _SCHEMA)
+        # drop lanes nobody has used for an hour; they would be full anyway
+        self.conn.execute(
+            "DELETE FROM buckets WHERE updated_at < ? AND paused_until < ?",
+            (time.time() - 3600, time.time()),
+        )
+        self._lock = threading.Lock()
+
+    def take(self, name: str, rate: float, capacity: float) -> float:
+        """Take a token from `name`; returns 0 on success, else the seconds to wait."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self.conn.execute(
+                    "SELECT tokens, updated_at, paused_until FROM buckets WHERE name = ?",
+                    (name,),
+                ).fetchone()
+                tokens, updated_at, paused_until = row or (capacity, now, 0.0)
+
+                if now < paused_until:
+                    wait = paused_until - now
+                else:
+                    tokens = min(capacity, tokens + (now - updated_at) * rate)
+                    updated_at = now
+                    if tokens >= 1:
+                        tokens -= 1
+                        wait = 0.0
+                    else:
+                        wait = (1 - tokens) / rate
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, paused_until) "
+                    "VALUES (?, ?, ?, ?)",
+                    (name, tokens, updated_at, paused_until),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    def pause(self, name: str, seconds: float):
+        with self._lock:
+            now = time.time()
+            self.conn.execute(
+                "INSERT INTO buckets (name, tokens, updated_at, paused_until) "
+                "VALUES (?, 0, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+                "paused_until = MAX(paused_until, excluded.paused_until)",
+                (name, now, now + seconds),
+            )
+
+
+class SharedTokenBucket:
+    """A `TokenBucket` whose state lives in a `BucketStore` shared across processes."""
+
+    def __init__(
+        self, store: BucketStore, name: str, rate: float, capacity: float = 1.0
+    ):
+        self.store = store
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.used_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def pause(self, seconds: float):
+        # the store's lock may be held by a `take` waiting on the database
+        await asyncio.to_thread(self.store.pause, self.name, seconds)
+
+    def is_idle(self) -> bool:
+        refill_time = self.capacity / self.rate
+        return (
+            time.monotonic() - self.used_at >= refill_time and not self._lock.locked()
+        )
+
+    async def acquire(self):
+        # only one coroutine per process polls the shared bucket at a time
+        async with self._lock:
+            while True:
+                wait = await asyncio.to_thread(
+                    self.store.take, self.name, self.rate, self.capacity
+                )
+                if wait <= 0:
+                    self.used_at = time.monotonic()
+                    return
+                await asyncio.sleep(wait)
+
+
+class TelegramRateLimiter(BaseRateLimiter[int]):
+    """Applies telegram's global and per-chat flood limits to every bot request.
+
+    Requests carrying a `chat_id` to a message-sending endpoint draw from a
+    per-chat lane (1 msg/s for private chats, 20 msg/min for groups/channels) as
+    well as the global lane. A `RetryAfter` only pauses the lane that was hit.
+    `rate_limit_args` can be used to override the number of retries per request.
+
+    When `db_path` is set the buckets are kept in a SQLite database, so every
+    uvicorn worker and the bot process draw from the same budgets. Shared lanes
+    are named after the bot id, so bots with different tokens sharing one
+    database keep separate budgets.
+    """
+
+    def __init__(
+        self,
+        global_rate: float | None = None,
+        chat_rate: float | None = None,
+        group_rate: float | None = None,
+        max_retries: int | None = None,
+        db_path: str | None = None,
+    ):
+        global_rate = global_rate or settings.TELEGRAM_GLOBAL_RATE
+        db_path = db_path or settings.TELEGRAM_RATE_LIMIT_DB
+        self.store = BucketStore(db_path) if db_path else None
+        # Telegram's limits are per token; the bot id is the part before ':'
+        self.bot_id = settings.TELEGRAM_TOKEN.split(":", 1)[0]
+        self.global_lane = self._make_lane("global", global_rate, global_rate)
+        self.chat_rate = chat_rate or settings.TELEGRAM_CHAT_RATE
+        self.group_rate = group_rate or settings.TELEGRAM_GROUP_RATE
+        self.max_retries = (
+            settings.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self._chat_lanes: dict[int | str, TokenBucket | SharedTokenBucket] = {}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _make_lane(
+        self, name: str, rate: float, capacity: float = 1.0
+    ) -> TokenBucket | SharedTokenBucket:
+        if self.store is not None:
+            return SharedTokenBucket(
+                self.store, f"{self.bot_id}:{name}", rate, capacity
+            )
+        return TokenBucket(rate, capacity)
+
+    def _get_chat_lane(self, chat_id: int | str) -> TokenBucket | SharedTokenBucket:
+        if len(self._chat_lanes) > _MAX_IDLE_LANES:
+            for key, lane in list(self._chat_lanes.items()):
+                if key != chat_id and lane.is_idle():
+                    del self._chat_lanes[key]
+
+        if chat_id not in self._chat_lanes:
+            # negative ids are groups/supergroups; string ids (@username) are channels
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            self._chat_lanes[chat_id] = self._make_lane(f"chat:{chat_id}", rate)
+        return self._chat_lanes[chat_id]
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, bool | dict | list[dict]]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: int | None,
+    ) -> bool | dict | list[dict]:
+        max_retries = (
+            rate_limit_args if rate_limit_args is not None else self.max_retries
+        )
+
+        chat_id = data.get("chat_id")
+        with contextlib.suppress(ValueError, TypeError):
+            chat_id = int(chat_id)
+
+        chat_lane = None
+        if chat_id is not None and endpoint.startswith(_MESSAGE_ENDPOINT_PREFIXES):
+            chat_lane = self._get_chat_lane(chat_id)
+
+        for attempt in range(max_retries + 1):
+            if chat_lane is not None:
+                await chat_lane.acquire()
+            await self.global_lane.acquire()
+
+            outcome = "error"
+            started = time.monotonic()
+            try:
+                with metrics.TELEGRAM_IN_FLIGHT.labels(endpoint).track_inprogress():
+                    result = await callback(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except RetryAfter as e:
+                outcome = "retry_after"
+                if attempt == max_retries:
+                    raise
+
+                lane = chat_lane if chat_lane is not None else self.global_lane
+                await lane.pause(e.retry_after + 0.1)
+                logger.warn(
+                    "Telegram rate limit hit on {endpoint=}, retrying in {retry_after=}s",
+                    endpoint=endpoint,
+                    retry_after=e.retry_after,
+                    chat_id=chat_id,
+                    attempt=attempt + 1,
+                )
+            finally:
+                metrics.TELEGRAM_REQUESTS.labels(endpoint, outcome).inc()
+                metrics.TELEGRAM_REQUEST_SECONDS.labels(endpoint).observe(
+                    time.monotonic() - started
+                )
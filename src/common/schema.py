@@ -1,21 +1,27 @@
+from dataclasses import dataclass
+
 from pydantic import BaseModel, Field
 
 
-class ChatData(BaseModel):
+@dataclass(slots=True)
+class ChatData:
     sender: int
     sent_by: str
     chat_id: int | None = None
     text: str | None = None
 
-    class Config:
-        arbitrary_types_allowed = True
-
 
 class TelegramMessage(BaseModel):
     chat_id: str = Field(..., description="The chat ID (user/group/channel/bot)")
     message: str = Field(..., description="The message to send")
 
 
+class MessageBatch(BaseModel):
+    messages: list[TelegramMessage] = Field(
+        ..., description="A list of messages to send"
+    )
+
+
 class InviteRequest(BaseModel):
     chat_id: str = Field(..., description="The chat ID (group/channel)")
     user_ids: list[str] = Field(..., description="A list of user IDs to invite")
@@ -26,6 +32,11 @@ class InviteBatch(BaseModel):
     invites: list[InviteRequest] = Field(..., description="A list of invites to send")
 
 
+class BroadcastRequest(BaseModel):
+    chat_ids: list[str] = Field(..., description="The chat IDs to send the message to")
+    message: str = Field(..., description="The message to send")
+
+
 class APIResponse(BaseModel):
     data: dict | None = None
     error: str | None = None
@@ -0,0 +1,20 @@
+import sqlite3
+
+
+def connect(
+    path: str, schema: str, isolation_level: str | None = None
+) -> sqlite3.Connection:
+    """Open a SQLite database that several processes and threads write to.
+
+    WAL lets readers run alongside the writer, and the busy timeout makes a
+    writer wait up to 5s for the lock instead of failing straight away.
+    Autocommit by default; pass `isolation_level=""` for implicit transactions.
+    """
+    conn = sqlite3.connect(
+        path, isolation_level=isolation_level, check_same_thread=False
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(schema)
+    return conn
@@ -0,0 +1,35 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+async def bounded_as_completed(
+    aws: Iterable[Awaitable[T]], limit: int
+) -> AsyncIterator[T]:
+    """Run awaitables with at most `limit` in flight, yielding results as they finish.
+
+    `aws` is consumed lazily, so a generator of coroutines keeps memory bounded
+    by `limit` regardless of how many items it produces. Pending tasks are
+    cancelled if the consumer stops iterating early.
+    """
+    pending: set[asyncio.Future] = set()
+    try:
+        for aw in aws:
+            pending.add(asyncio.ensure_future(aw))
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
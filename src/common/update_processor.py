@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Awaitable
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor, SimpleUpdateProcessor
+
+
+def _ordering_key(update: object) -> int | None:
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates from different chats concurrently, each chat in order.
+
+    Updates from the same chat wait on a per-chat lock before taking one of the
+    `max_concurrent_updates` slots of a wrapped `SimpleUpdateProcessor`, so a
+    slow handler only delays its own chat and conversation state machines still
+    see their updates one at a time.
+
+    The base class admits an update before `do_process_update`, while it may
+    still be waiting for its chat, so its own limit only caps how many updates
+    are pending (`max_pending_updates`); a busy chat cannot use up the slots.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int = 4096):
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self._running = SimpleUpdateProcessor(max_concurrent_updates)
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._waiting: dict[int, int] = {}
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        key = _ordering_key(update)
+        if key is None:
+            await self._running.process_update(update, coroutine)
+            return
+
+        # the application starts one task per update in arrival order and
+        # asyncio.Lock is FIFO, so same-chat updates run in the order received
+        lock = self._chat_locks.setdefault(key, asyncio.Lock())
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            async with lock:
+                await self._running.process_update(update, coroutine)
+        finally:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                del self._chat_locks[key]
+
+    async def initialize(self) -> None:
+        await self._running.initialize()
+
+    async def shutdown(self) -> None:
+        await self._running.shutdown()
@@ -1,8 +1,40 @@
+import asyncio
+import random
+from functools import partial
+
 import httpx
 
+from common.cache import SingleFlight, TTLCache
+from common.circuit_breaker import CircuitBreaker, CircuitOpenError
 from common.config import settings
+from common.lazy import LazyObject
 from common.schema import APIResponse
 
+UNAVAILABLE_MESSAGE = (
+    "Our servers are temporarily unavailable. Please try again in a few minutes."
+)
+
+# failures where the request never reached the backend, or it asked us to retry
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_REJECTED_STATUSES = {429, 503}
+# a gateway error may come after the backend processed the request, so only
+# requests that are safe to repeat are retried on them
+_GATEWAY_STATUSES = {502, 504}
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+breaker: CircuitBreaker = LazyObject(
+    lambda: CircuitBreaker(
+        failure_threshold=settings.WEB_API_BREAKER_THRESHOLD,
+        reset_timeout=settings.WEB_API_BREAKER_RESET,
+    )
+)
+
+# successful registrations and in-flight attempts, keyed by telegram user id
+_registered: TTLCache[str, APIResponse] = LazyObject(
+    lambda: TTLCache(settings.REGISTRATION_CACHE_SIZE, settings.REGISTRATION_CACHE_TTL)
+)
+_registering: SingleFlight[str] = SingleFlight()
+
 
 def get_auth_headers():
     return {"X-API-Key": settings.WEB_API_KEY}
@@ -12,23 +44,134 @@ def get_endpoint(endpoint: str):
     return f"{settings.WEB_API_URL}/{endpoint}"
 
 
-async def register_user(phone_number: str, telegram_user_id: str):
+_client: httpx.AsyncClient | None = None
+
+
+async def open_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=get_auth_headers(),
+            http2=settings.WEB_API_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.WEB_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEB_API_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(
+                settings.WEB_API_TIMEOUT, connect=settings.WEB_API_CONNECT_TIMEOUT
+            ),
+        )
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared client, opening it if the bot's post_init hasn't yet."""
+    if _client is None:
+        await open_client()
+    return _client
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter: uniform over [0, 0.2s * 2^attempt]
+    return random.uniform(0, 0.2 * 2**attempt)
+
+
+async def _request(method: str, endpoint: str, **kwargs) -> httpx.Response:
+    """Send a request through the circuit breaker, retrying safe failures.
+
+    Connection failures, 429 and 503 are retried for every method; 502 and 504
+    only for idempotent ones. The breaker counts one outcome per call, however
+    many attempts it took. The whole call, retries included, must finish within
+    `WEB_API_BUDGET` seconds; otherwise a `TimeoutError` is raised.
+    """
+    breaker.check()
+    retryable_statuses = _REJECTED_STATUSES
+    if method.upper() in _IDEMPOTENT_METHODS:
+        retryable_statuses = _REJECTED_STATUSES | _GATEWAY_STATUSES
+
+    try:
+        client = await get_client()
+        response = await _send(client, method, endpoint, retryable_statuses, **kwargs)
+    except BaseException:
+        breaker.record_failure()
+        raise
+
+    if response.status_code < 500 and response.status_code != 429:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    return response
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    method: str,
+    endpoint: str,
+    retryable_statuses: set[int],
+    **kwargs,
+) -> httpx.Response:
+    async with asyncio.timeout(settings.WEB_API_BUDGET):
+        for attempt in range(settings.WEB_API_RETRIES + 1):
+            last_attempt = attempt == settings.WEB_API_RETRIES
+            try:
+                response = await client.request(
+                    method, get_endpoint(endpoint), **kwargs
+                )
+            except _RETRYABLE_ERRORS:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in retryable_statuses or last_attempt:
+                    return response
+
+            await asyncio.sleep(_backoff(attempt))
+
+
+async def register_user(phone_number: str, telegram_user_id: str) -> APIResponse:
+    """Register a telegram user, at most once per user.
+
+    Repeat calls for an already registered user are answered from memory, and
+    concurrent calls for the same user share a single request to the backend.
+    """
+    key = str(telegram_user_id)
+    res = _registered.get(key)
+    if res is not None:
+        return res
+
+    res = await _registering.do(
+        key, partial(_register_user, phone_number, telegram_user_id)
+    )
+    if not res.error:
+        _registered.set(key, res)
+    return res
+
+
+async def _register_user(phone_number: str, telegram_user_id: str) -> APIResponse:
     if not phone_number.startswith("+"):
         phone_number = f"+{phone_number}"
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                get_endpoint("auth/register-telegram"),
-                headers=get_auth_headers(),
-                json={
-                    "phone_number": phone_number,
-                    "telegram_user_id": telegram_user_id,
-                },
-            )
-            response.raise_for_status()
-            res = APIResponse(**response.json())
-            return res
+        response = await _request(
+            "POST",
+            "auth/register-telegram",
+            json={
+                "phone_number": phone_number,
+                "telegram_user_id": telegram_user_id,
+            },
+        )
+        response.raise_for_status()
+        res = APIResponse(**response.json())
+        return res
+    except (CircuitOpenError, TimeoutError, httpx.TransportError):
+        return APIResponse(error=UNAVAILABLE_MESSAGE)
     except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500 or e.response.status_code == 429:
+            return APIResponse(error=UNAVAILABLE_MESSAGE)
         return APIResponse(
             error=f"HTTP error: {e.response.status_code} - {e.response.text}"
         )
@@ -0,0 +1,86 @@
+import secrets
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request, Response, status
+from telegram import Update
+from telegram.ext import Application
+
+from common.config import settings
+
+WEBHOOK_PATH = "/telegram/webhook"
+
+
+def create_webhook_app(application: Application) -> FastAPI:
+    """ASGI app that validates Telegram webhook calls and queues their updates."""
+    webhook_app = FastAPI()
+
+    @webhook_app.post(WEBHOOK_PATH, status_code=status.HTTP_200_OK)
+    async def telegram_webhook(
+        request: Request,
+        secret_token: str | None = Header(
+            None, alias="X-Telegram-Bot-Api-Secret-Token"
+        ),
+    ):
+        if secret_token is None or not secrets.compare_digest(
+            secret_token, settings.TELEGRAM_WEBHOOK_SECRET
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Invalid secret token"
+            )
+
+        # any malformed body is the sender's fault, not a server error
+        try:
+            data = await request.json()
+            if not isinstance(data, dict):
+                raise TypeError("update must be a JSON object")
+            update = Update.de_json(data, application.bot)
+        except Exception:
+            update = None
+        if not isinstance(update, Update):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid update"
+            )
+        await application.update_queue.put(update)
+        return Response(status_code=status.HTTP_200_OK)
+
+    @webhook_app.get("/health", status_code=status.HTTP_200_OK)
+    async def health():
+        return {"status": "ok"}
+
+    return webhook_app
+
+
+async def run_webhook(application: Application):
+    """Serve updates via webhook until the server is asked to exit."""
+    if not settings.TELEGRAM_WEBHOOK_SECRET:
+        raise ValueError("TELEGRAM_WEBHOOK_SECRET must be set to run in webhook mode")
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_webhook_app(application),
+            host="127.0.0.1",
+            port=settings.TELEGRAM_WEBHOOK_PORT,
+        )
+    )
+
+    # same hook order as run_polling: post_shutdown runs after shutdown() has
+    # flushed persistence, which may still need the web client
+    try:
+        async with application:
+            if application.post_init:
+                await application.post_init(application)
+            await application.bot.set_webhook(
+                url=f"{settings.TELEGRAM_WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+            )
+            await application.start()
+            try:
+                await server.serve()
+            finally:
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+    finally:
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,85 @@
+# src/embedding_batcher.py
+
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+import asyncio
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text embedding requests into encoder batches.
+
+    Requests are queued and a dispatcher task takes up to `max_batch` of them,
+    waiting at most `max_wait` seconds after the first for more to arrive. The
+    batch is encoded on `executor` and each caller gets its own row back.
+    While a batch is encoding, new requests keep queueing, so batches grow
+    with load instead of the encoder running many tiny forward passes.
+    """
+
+    def __init__(
+        self,
+        embed: Embedder,
+        executor: Executor,
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+    ):
+        self.embed = embed
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue[Tuple[str, asyncio.Future]]] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def submit(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if (
+            self._dispatcher is None
+            or self._dispatcher.done()
+            or self._dispatcher.get_loop() is not loop
+        ):
+            self._queue = asyncio.Queue()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            try:
+                async with asyncio.timeout_at(deadline):
+                    batch.append(await self._queue.get())
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # callers that gave up don't need encoding
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                embeddings = await loop.run_in_executor(
+                    self.executor, self.embed, [text for text, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
@@ -0,0 +1,124 @@
+# src/embedding_cache.py
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import fcntl
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+
+_MIN_CAPACITY = 1024
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embeddings on disk, one store per model.
+
+    Vectors live in `<model>.f32`, a float32 matrix that is memory-mapped and
+    grown by doubling. `<model>.idx` lists the sha256 of each row's text, one
+    per line, and is only appended to after the rows it names are flushed, so
+    a crash never leaves an index entry pointing at a missing vector. Writers
+    hold an exclusive lock on the index, so the bot and `seed_db.py` can share
+    a store.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dim: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.dim = dim
+        self.index_path = directory / f"{slug}.idx"
+        self.matrix_path = directory / f"{slug}.f32"
+        self.index_path.touch()
+        self.matrix_path.touch()
+
+        self._rows: Dict[str, int] = {}
+        self._index_offset = 0
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _refresh(self):
+        """Pick up rows appended since the last read, by this or another process."""
+        if os.path.getsize(self.index_path) == self._index_offset:
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # a partially written last line belongs to a writer that hasn't finished
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            self._rows.setdefault(line.decode(), len(self._rows))
+        self._index_offset += len(complete)
+
+    def _map(self, rows: int) -> np.memmap:
+        if self._matrix is None or len(self._matrix) < rows:
+            capacity = os.path.getsize(self.matrix_path) // (4 * self.dim)
+            self._matrix = np.memmap(
+                self.matrix_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(capacity, self.dim),
+            )
+        return self._matrix
+
+    def _reserve(self, rows: int):
+        capacity = os.path.getsize(self.matrix_path) // (4 * self.dim)
+        if capacity < rows:
+            capacity = max(rows, capacity * 2, _MIN_CAPACITY)
+            with open(self.matrix_path, "r+b") as f:
+                f.truncate(capacity * 4 * self.dim)
+            self._matrix = None
+
+    def get(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached embedding for each text, or None where it hasn't been seen."""
+        with self._lock:
+            keys = [text_key(text) for text in texts]
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+
+            rows = [self._rows.get(key) for key in keys]
+            if all(row is None for row in rows):
+                return [None] * len(texts)
+
+            matrix = self._map(len(self._rows))
+            return [None if row is None else matrix[row].tolist() for row in rows]
+
+    def put(self, texts: List[str], vectors: List[List[float]]):
+        with self._lock, open(self.index_path, "ab") as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                new = {}
+                for text, vector in zip(texts, vectors):
+                    key = text_key(text)
+                    if key not in self._rows and key not in new:
+                        new[key] = vector
+                if not new:
+                    return
+
+                start = len(self._rows)
+                self._reserve(start + len(new))
+                matrix = self._map(start + len(new))
+                matrix[start : start + len(new)] = np.asarray(
+                    list(new.values()), dtype=np.float32
+                )
+                matrix.flush()
+
+                lines = "".join(f"{key}\n" for key in new).encode()
+                index.write(lines)
+                index.flush()
+                os.fsync(index.fileno())
+                for key in new:
+                    self._rows[key] = len(self._rows)
+                self._index_offset += len(lines)
+            finally:
+                fcntl.flock(index, fcntl.LOCK_UN)
@@ -0,0 +1,207 @@
+# src/encoders.py
+
+from pathlib import Path
+from typing import List, Optional
+import json
+import re
+
+import numpy as np
+
+
+def _model_file(model_name: str, filename: str) -> Optional[Path]:
+    """A file from a local model directory or the Hugging Face hub, if it exists."""
+    local = Path(model_name) / filename
+    if local.exists():
+        return local
+
+    from huggingface_hub import hf_hub_download
+    from huggingface_hub.utils import EntryNotFoundError
+
+    try:
+        return Path(hf_hub_download(model_name, filename))
+    except EntryNotFoundError:
+        return None
+
+
+class TorchEncoder:
+    """The model run as a `SentenceTransformer`, on GPU when one is available."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        import torch
+
+        self.model_name = model_name
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer(model_name, device=self.device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        return self.model.encode(
+            texts,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            batch_size=batch_size,
+            device=self.device,
+        ).tolist()
+
+
+class OnnxEncoder:
+    """The model run through ONNX Runtime on CPU, with int8 weights by default.
+
+    On first use the transformer is exported to ONNX (needs torch) and
+    dynamically quantized; the files are kept in `directory` and later starts
+    only load them, without torch. Pooling and sequence length follow the
+    model's sentence-transformers config, so embeddings match `TorchEncoder`
+    up to quantization error. Only Transformer + Pooling (+ Normalize) models
+    are supported.
+    """
+
+    def __init__(self, model_name: str, directory: Path, quantize: bool = True):
+        import onnxruntime as ort
+
+        self.model_name = model_name
+        self.name = "onnx-int8" if quantize else "onnx"
+        self._check_modules()
+
+        model_dir = directory / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        fp32_path = model_dir / "model.onnx"
+        int8_path = model_dir / "model.int8.onnx"
+        if not fp32_path.exists():
+            self._export(fp32_path)
+        if quantize and not int8_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+        self.session = ort.InferenceSession(
+            str(int8_path if quantize else fp32_path),
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+        self.max_length, self.pooling = self._sentence_config()
+        self.tokenizer = self._load_tokenizer()
+
+    def _check_modules(self):
+        modules_path = _model_file(self.model_name, "modules.json")
+        if modules_path is None:
+            return
+        for module in json.loads(modules_path.read_text()):
+            kind = module["type"].rsplit(".", 1)[-1]
+            if kind not in ("Transformer", "Pooling", "Normalize"):
+                raise ValueError(
+                    f"{self.model_name} has a {kind} module, which the ONNX backend doesn't run"
+                )
+
+    def _load_tokenizer(self):
+        # the `tokenizers` runtime only; transformers would pull in torch
+        from tokenizers import Tokenizer
+
+        tokenizer_path = _model_file(self.model_name, "tokenizer.json")
+        if tokenizer_path is None:
+            raise ValueError(
+                f"{self.model_name} has no tokenizer.json for the ONNX backend"
+            )
+        tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        tokenizer.enable_padding()
+        tokenizer.enable_truncation(max_length=self.max_length)
+        return tokenizer
+
+    def _sentence_config(self):
+        max_length = 512
+        config_path = _model_file(self.model_name, "sentence_bert_config.json")
+        if config_path is not None:
+            max_length = json.loads(config_path.read_text()).get(
+                "max_seq_length", max_length
+            )
+
+        pooling = "mean"
+        pooling_path = _model_file(self.model_name, "1_Pooling/config.json")
+        if pooling_path is not None and json.loads(pooling_path.read_text()).get(
+            "pooling_mode_cls_token"
+        ):
+            pooling = "cls"
+        return max_length, pooling
+
+    def _export(self, path: Path):
+        from transformers import AutoModel, AutoTokenizer
+        import torch
+
+        class LastHiddenState(torch.nn.Module):
+            # fixed input order, whatever the wrapped model's forward signature is
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, input_ids, attention_mask, token_type_ids=None):
+                kwargs = {"input_ids": input_ids, "attention_mask": attention_mask}
+                if token_type_ids is not None:
+                    kwargs["token_type_ids"] = token_type_ids
+                return self.model(**kwargs).last_hidden_state
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tokens = AutoTokenizer.from_pretrained(self.model_name)(
+            ["export this"], return_tensors="pt"
+        )
+        input_names = [
+            name
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in tokens
+        ]
+        model = LastHiddenState(AutoModel.from_pretrained(self.model_name).eval())
+        dynamic_axes = {
+            name: {0: "batch", 1: "sequence"}
+            for name in input_names + ["last_hidden_state"]
+        }
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(tokens[name] for name in input_names),
+                str(path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                # the TorchScript exporter; the dynamo one needs onnxscript
+                dynamo=False,
+            )
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start : start + batch_size])
+            tokens = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array(
+                    [e.attention_mask for e in encodings], dtype=np.int64
+                ),
+                "token_type_ids": np.array(
+                    [e.type_ids for e in encodings], dtype=np.int64
+                ),
+            }
+            feed = {name: tokens[name] for name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+
+            if self.pooling == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = tokens["attention_mask"][..., None].astype(np.float32)
+                counts = np.clip(mask.sum(axis=1), 1e-9, None)
+                pooled = (hidden * mask).sum(axis=1) / counts
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled /= np.clip(norms, 1e-12, None)
+            embeddings.extend(pooled.tolist())
+
+        return embeddings
+
+
+def load_encoder(backend: str, model_name: str, directory: Path):
+    """`torch`, `onnx` (fp32) or `onnx-int8`."""
+    if backend == "torch":
+        return TorchEncoder(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, directory, quantize=backend == "onnx-int8")
+    raise ValueError(f"Unknown embedding backend: {backend}")
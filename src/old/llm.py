@@ -1,26 +1,34 @@
 # src/llm.py
 
-from sentence_transformers import SentenceTransformer
-import torch
-
 from langsmith.wrappers import wrap_openai
 from langsmith import traceable
 
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from openai import AsyncOpenAI
 from pydantic import BaseModel, Field, field_validator
 import instructor
 import asyncio
+import inspect
+import threading
 
-from typing import List
+from typing import AsyncIterator, List
+from pathlib import Path
 from enum import Enum
 
 from settings import config
 from models import Message, RetrievedLecture
+from embedding_batcher import EmbeddingBatcher
+from embedding_cache import EmbeddingCache
+from encoders import load_encoder
+
+# a single thread owns the encoder; torch parallelizes within each batch
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encoder")
 
-executor = ThreadPoolExecutor()
-encoder = SentenceTransformer(config.EMBEDDING_MODEL)
-device = "cuda" if torch.cuda.is_available() else "cpu"
+# loaded on first use or by `start_warmup`, never at import
+encoder = None
+embedding_cache = None
+_load_lock = threading.Lock()
+_warmup: Future | None = None
 
 client = wrap_openai(
     AsyncOpenAI(
@@ -33,58 +41,87 @@ client = instructor.patch(client, mode=instructor.Mode.TOOLS)
 sem = asyncio.Semaphore(5)  # rate limit
 
 
+def load_models():
+    """Load the encoder and its embedding cache, and run one encode to warm it up."""
+    global encoder, embedding_cache
+
+    with _load_lock:
+        if encoder is not None:
+            return
+
+        # settings.py predates the option, so torch stays the default
+        loaded = load_encoder(
+            getattr(config, "EMBEDDING_BACKEND", "torch"),
+            config.EMBEDDING_MODEL,
+            Path(__file__).parent.parent / "onnx-models",
+        )
+        # quantized embeddings differ slightly, so each backend gets its own store
+        cache_name = config.EMBEDDING_MODEL
+        if loaded.name != "torch":
+            cache_name = f"{config.EMBEDDING_MODEL}-{loaded.name}"
+        embedding_cache = EmbeddingCache(
+            Path(__file__).parent.parent / "embedding-cache", cache_name, loaded.dim
+        )
+        # the first inference allocates buffers and builds kernels
+        loaded.encode(["warm up"], batch_size=1)
+        encoder = loaded
+
+
+def start_warmup() -> Future:
+    """Load the models on the encoder thread; embedding calls queue behind it.
+
+    A warm-up that failed is submitted again.
+    """
+    global _warmup
+
+    if _warmup is None or (_warmup.done() and _warmup.exception() is not None):
+        _warmup = executor.submit(load_models)
+    return _warmup
+
+
+def readiness() -> str:
+    """`ready`, `warming up`, or `failed` if loading the models raised."""
+    if encoder is not None:
+        return "ready"
+    if _warmup is not None and _warmup.done() and _warmup.exception() is not None:
+        return "failed"
+    return "warming up"
+
+
 def embed(
     texts: List[str] | str, batch_size: int = 64
 ) -> List[List[float]] | List[float]:
+    """Embed texts, running the encoder only for texts not in the embedding cache."""
     if isinstance(texts, str):
-        embeddings = encoder.encode(
-            [texts],
-            normalize_embeddings=True,
-            show_progress_bar=False,
-            batch_size=1,
-            device=device,
-        ).tolist()[0]
-    else:
-        embeddings = encoder.encode(
-            texts,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-            batch_size=batch_size,
-            device=device,
-        ).tolist()
+        return embed([texts], batch_size=1)[0]
+
+    load_models()
+
+    embeddings = embedding_cache.get(texts)
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if misses:
+        # duplicates within a batch are encoded once
+        unique = list(dict.fromkeys(texts[i] for i in misses))
+        encoded = dict(zip(unique, encoder.encode(unique, batch_size)))
+        embedding_cache.put(unique, [encoded[text] for text in unique])
+        for i in misses:
+            embeddings[i] = encoded[texts[i]]
 
     return embeddings
 
 
+# concurrent single-text calls (search queries) share encoder batches
+batcher = EmbeddingBatcher(embed, executor, max_batch=64, max_wait=0.005)
+
+
 async def embed_async(
     texts: List[str] | str, batch_size: int = 64
 ) -> List[List[float]] | List[float]:
-    loop = asyncio.get_event_loop()
-
     if isinstance(texts, str):
-        embeddings = await loop.run_in_executor(
-            executor,
-            lambda: encoder.encode(
-                [texts],
-                normalize_embeddings=True,
-                show_progress_bar=False,
-                batch_size=1,
-                device=device,
-            ).tolist()[0],
-        )
-    else:
-        embeddings = await loop.run_in_executor(
-            executor,
-            lambda: encoder.encode(
-                texts,
-                normalize_embeddings=True,
-                show_progress_bar=False,
-                batch_size=batch_size,
-                device=device,
-            ).tolist(),
-        )
+        return await batcher.submit(texts)
 
-    return embeddings
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, embed, texts, batch_size)
 
 
 class QuestionUnderstanding(BaseModel):
@@ -121,25 +158,15 @@ class SubjectType(Enum):
     JS_MISC = "Js misc"
 
 
+_SUBJECT_LIST = "\n".join(f"- '{subject.value}'" for subject in SubjectType)
+
+
 class QuestionSubject(BaseModel):
-    """
-    Predict the subject(s) that the question is asking about.
-    Here are the available subjects:
-    - 'Getting started'
-    - 'First steps'
-    - 'Code quality'
-    - 'Object basics'
-    - 'Data types'
-    - 'Advanced functions'
-    - 'Object properties'
-    - 'Prototypes'
-    - 'Classes'
-    - 'Error handling'
-    - 'Async'
-    - 'Generators iterators'
-    - 'Modules'
-    - 'Js misc'
-    """
+    # built from SubjectType so the prompt can't drift from the allowed values
+    __doc__ = (
+        "Predict the subject(s) that the question is asking about.\n"
+        f"Here are the available subjects:\n{_SUBJECT_LIST}"
+    )
 
     chain_of_thought: str = Field(
         ..., description="The chain of thought that led to the classification"
@@ -156,6 +183,19 @@ class QuestionSubject(BaseModel):
         return v
 
 
+# bases in this order so the fields come out as chain of thought, question, subjects
+class QuestionAnalysis(QuestionSubject, QuestionUnderstanding):
+    __doc__ = (
+        f"{inspect.cleandoc(QuestionUnderstanding.__doc__)}\n"
+        f"{QuestionSubject.__doc__}"
+    )
+
+    chain_of_thought: str = Field(
+        ...,
+        description="The chain of thought that led to this question and its classification.",
+    )
+
+
 @traceable(name="extract-question")
 async def extract_question(user_question: str) -> QuestionUnderstanding:
     """Use LLM to expand on user's question"""
@@ -194,66 +234,121 @@ async def determine_subject(question: QuestionUnderstanding) -> str:
         )
 
 
-class AIAnswer(BaseModel):
-    """The answer to a user's question. If the context documents provided are relevant, use them to guide your answer. If they are not relevant to the question, ignore them and do not mention them in the answer."""
+@traceable(name="understand-question")
+async def understand_question(
+    user_question: str, single_call: bool = True
+) -> QuestionAnalysis:
+    """Use LLM to paraphrase the question and determine its subject.
 
-    chain_of_thought: str = Field(
-        ..., description="The chain of thought that led to this classification."
-    )
-    answer: str = Field(
-        ..., description="A concise, accurate answer to the user's question."
-    )
-    relevance: int = Field(
-        ...,
-        description="""\
-How relevant the answer is to the question and the provided context.
+    `single_call` asks for both in one structured response; otherwise
+    `extract_question` and `determine_subject` run one after the other.
+    """
+
+    if not single_call:
+        _, res_q = await extract_question(user_question)
+        _, res_s = await determine_subject(res_q.question)
+        return QuestionAnalysis(
+            chain_of_thought=f"{res_q.chain_of_thought}\n{res_s.chain_of_thought}",
+            question=res_q.question,
+            subjects=res_s.subjects,
+        )
+
+    async with sem:
+        return await client.chat.completions.create(
+            model=config.LLM,
+            response_model=QuestionAnalysis,
+            max_retries=2,
+            messages=[
+                Message(
+                    role="user",
+                    content=f"Figure out what this question is trying to ask and determine its subject: {user_question}",
+                ).model_dump()
+            ],
+        )
+
+
+class AnswerSources(BaseModel):
+    """The lectures an answer relied on. Only list a lecture if the answer uses information from its documents."""
 
-On a scale of 1 to 5; a score of 1 indicates the answer does not rely on the \
-context at all; a score of 5 indicates the answer makes intelligent use of the \
-provided context.
-""",
-    )
     sources: List[str] = Field(
         ...,
-        description="A list of the lecture titles for each document used to answer the question.",
+        description="A list of the lecture titles for each document used in the answer.",
     )
 
 
+ANSWER_SYSTEM_PROMPT = """\
+You are a senior full stack engineer at Evil inc.
+
+You are currently teaching a team of new interns an introductory course on \
+full-stack development. Answer the students questions using ONLY information \
+from retrieved from your lecture notes.
+
+Your answers must be concise and acccurate. If the documents are not relevant \
+to the question, ignore them and do not mention them in the answer.
+"""
+
+
+def _documents(context_docs: List[RetrievedLecture]) -> str:
+    return f"{'-' * 80}\n".join([str(doc) for doc in context_docs])
+
+
 @traceable(name="answer-question")
 async def answer_question(
     question: str, context_docs: List[RetrievedLecture]
-) -> AIAnswer:
-    """Use LLM to answer the question"""
+) -> AsyncIterator[str]:
+    """Use LLM to answer the question, yielding the answer text as it is generated.
 
-    docs_str = f"{'-' * 80}\n".join([str(doc) for doc in context_docs])
+    The answer is plain text so it can be shown while it streams; use
+    `cite_sources` afterwards for the lectures it relied on.
+    """
 
     async with sem:
-        return await client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=config.LLM,
-            response_model=AIAnswer,
-            max_retries=2,
+            response_model=None,
+            stream=True,
             messages=[
+                Message(role="system", content=ANSWER_SYSTEM_PROMPT).model_dump(),
                 Message(
-                    role="system",
-                    content="""\
-You are a senior full stack engineer at Evil inc.
-
-You are currently teaching a team of new interns an introductory course on \
-full-stack development. Answer the students questions using ONLY information \
-from retrieved from your lecture notes.
+                    role="user",
+                    content=f"""\
+Here is my question '{question}'
 
-Your answers must be concise and acccurate.
+Here are the relevant documents from the lecture notes:
+{_documents(context_docs)}
 """,
                 ).model_dump(),
+            ],
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+@traceable(name="cite-sources")
+async def cite_sources(answer: str, context_docs: List[RetrievedLecture]) -> List[str]:
+    """Use LLM to pick the retrieved lectures that the answer relied on"""
+
+    lectures = list(dict.fromkeys(doc.lecture for doc in context_docs))
+    if not lectures:
+        return []
+
+    async with sem:
+        res = await client.chat.completions.create(
+            model=config.LLM,
+            response_model=AnswerSources,
+            max_retries=2,
+            messages=[
                 Message(
                     role="user",
                     content=f"""\
-Here is my question '{question}'
+Here is an answer '{answer}'
 
-Here are the relevant documents from the lecture notes:
-{docs_str}
+Which of these documents from the lecture notes does it use?
+{_documents(context_docs)}
 """,
-                ).model_dump(),
+                ).model_dump()
             ],
-            # max_tokens=1024,
         )
+    # keep retrieval order and drop titles that weren't retrieved
+    return [lecture for lecture in lectures if lecture in res.sources]
@@ -15,13 +15,17 @@ from telegram.ext import (
     ConversationHandler,
     CallbackQueryHandler,
 )
+from contextlib import aclosing
 import asyncio
+import time
 
 from loguru import logger
 
 from pathlib import Path
 
 from settings import config
+from semantic_cache import SemanticCache
+from stream import ThrottledEditor, send_text
 import mongo
 import llm
 
@@ -38,12 +42,38 @@ logger.add(
 
 client, db = mongo.connect()
 
+# replies to earlier questions, matched on the embedding of the user's message
+answer_cache: SemanticCache[str] = SemanticCache(
+    threshold=0.95, maxsize=1024, ttl=24 * 60 * 60
+)
+SEED_CHECK_INTERVAL = 60
+seed_version = None
+seed_checked_at = 0.0
+
 
 async def fetch_subjects():
     subjects = await mongo.get_subjects(db)
     return subjects
 
 
+async def sync_with_seed():
+    """Drop cached answers and reload subjects after the lectures are re-seeded."""
+
+    global subjects, seed_version, seed_checked_at
+
+    if time.monotonic() - seed_checked_at < SEED_CHECK_INTERVAL:
+        return
+    seed_checked_at = time.monotonic()
+
+    version = await mongo.get_seed_version(db)
+    if version != seed_version:
+        if seed_version is not None:
+            logger.info("Lectures were re-seeded, clearing the answer cache")
+            answer_cache.clear()
+            subjects = {str(r["title"]): r["_id"] for r in await fetch_subjects()}
+        seed_version = version
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a message when the command /start is issued."""
 
@@ -69,32 +99,78 @@ async def question(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     user_message = " ".join(context.args)
 
+    readiness = llm.readiness()
+    if readiness == "failed":
+        logger.error("Embedding model failed to load, retrying warm-up")
+        llm.start_warmup()
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="Document retrieval is unavailable right now. Please try again later.",
+        )
+        return
+    if readiness != "ready":
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="I'm still warming up. Please ask again in a few seconds.",
+        )
+        return
+
+    query_vector = await llm.embed_async(user_message)
+    await sync_with_seed()
+
+    cached_answer = answer_cache.get(query_vector)
+    if cached_answer is not None:
+        logger.info("Answering from the semantic cache")
+        bot_message = await send_text(
+            context.bot, update.effective_chat.id, cached_answer
+        )
+        await bot_message.chat.set_message_reaction(
+            message_id=bot_message.message_id, reaction=ReactionTypeEmoji("👍")
+        )
+        return
+
     bot_message = await context.bot.send_message(
         chat_id=update.effective_chat.id, text="Working on it..."
     )
+    editor = ThrottledEditor(bot_message)
 
     logger.info("Asking Mixtral")
-    _, res_q = await llm.extract_question(user_message)
-    _, res_s = await llm.determine_subject(res_q.question)
+    analysis = await llm.understand_question(user_message)
+    await editor.update(f"Looking for: {analysis.question}")
 
     context_docs = await mongo.vector_search(
         db,
-        query=res_q.question,
-        subject_ids=[str(subjects[title.value]) for title in res_s.subjects],
+        query=analysis.question,
+        subject_ids=[str(subjects[title.value]) for title in analysis.subjects],
     )
 
-    ai_answer = await llm.answer_question(res_q.question, context_docs)
+    # edits follow the generated text; the editor drops the ones that come too fast
+    answer = ""
+    # closing releases the LLM semaphore at once if the handler is aborted
+    async with aclosing(llm.answer_question(analysis.question, context_docs)) as tokens:
+        async for token in tokens:
+            answer += token
+            await editor.update(answer)
 
-    answer = f"{ai_answer.answer}\n\n" + "\n".join(
-        [f"- {x}" for x in ai_answer.sources]
-    )
+    sources = await llm.cite_sources(answer, context_docs)
+    if sources:
+        answer = f"{answer}\n\n" + "\n".join([f"- {x}" for x in sources])
 
-    await bot_message.edit_text(text=answer)
+    await editor.finish(answer)
+    answer_cache.set(query_vector, answer)
     await bot_message.chat.set_message_reaction(
         message_id=bot_message.message_id, reaction=ReactionTypeEmoji("👍")
     )
 
 
+async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Report whether the bot can answer questions yet."""
+
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id, text=f"Status: {llm.readiness()}"
+    )
+
+
 async def configure(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     user_name = update.effective_user.first_name or "there"
     await context.bot.send_message(
@@ -169,6 +245,11 @@ async def unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
 if __name__ == "__main__":
     app = ApplicationBuilder().token(config.TELEGRAM_TOKEN).build()
 
+    # the encoder loads while subjects are fetched and polling starts
+    llm.start_warmup().add_done_callback(
+        lambda f: logger.info(f"Embedding model {llm.readiness()}")
+    )
+
     loop = asyncio.get_event_loop()
     subjects = {
         str(r["title"]): r["_id"] for r in loop.run_until_complete(fetch_subjects())
@@ -176,6 +257,7 @@ if __name__ == "__main__":
 
     start_handler = CommandHandler("start", start)
     question_handler = CommandHandler("question", question)
+    status_handler = CommandHandler("status", status)
     conversation_handler = ConversationHandler(
         entry_points=[CommandHandler("configure", configure)],
         states={
@@ -190,6 +272,7 @@ if __name__ == "__main__":
 
     app.add_handler(start_handler)
     app.add_handler(question_handler)
+    app.add_handler(status_handler)
     app.add_handler(conversation_handler)
     app.add_handler(unknown_handler)  # must be last
 
@@ -6,6 +6,7 @@ from bson import ObjectId
 
 from pydantic import BaseModel
 from typing import List, Tuple
+import time
 
 from models import AtlasVectorSearch, RetrievedLecture
 from settings import config
@@ -31,6 +32,19 @@ async def get_subjects(db) -> List[dict]:
     return subjects
 
 
+async def mark_seeded(db):
+    """Record that the lecture collections were (re)built, for caches to notice."""
+    await db["meta"].update_one(
+        {"_id": "seed"}, {"$set": {"seeded_at": time.time()}}, upsert=True
+    )
+
+
+async def get_seed_version(db) -> float | None:
+    """When the lecture collections were last seeded, if known."""
+    document = await db["meta"].find_one({"_id": "seed"})
+    return document["seeded_at"] if document else None
+
+
 async def fetch(
     db, _id: str, collection: str, response_model: BaseModel | None = None
 ) -> dict:
@@ -0,0 +1,82 @@
+# src/semantic_cache.py
+
+from collections import OrderedDict
+from typing import Generic, List, Optional, Tuple, TypeVar
+import time
+
+import numpy as np
+
+V = TypeVar("V")
+
+
+class SemanticCache(Generic[V]):
+    """Answers keyed by question embedding, matched by cosine similarity.
+
+    Embeddings must be normalized (as `llm.embed` returns them), so similarity
+    is a dot product against a preallocated matrix; a lookup is one matrix-vector
+    product. The least recently used entry is evicted when the cache is full,
+    and entries older than `ttl` seconds are never returned.
+    """
+
+    def __init__(
+        self, threshold: float = 0.95, maxsize: int = 1024, ttl: float = 86400
+    ):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._used = np.zeros(maxsize, dtype=bool)
+        self._entries: OrderedDict[int, Tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _nearest(self, vector: List[float]) -> Tuple[int, float]:
+        scores = self._vectors @ np.asarray(vector, dtype=np.float32)
+        scores[~self._used] = -np.inf
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def _evict(self, slot: int):
+        del self._entries[slot]
+        self._used[slot] = False
+
+    def get(self, vector: List[float]) -> Optional[V]:
+        if not self._entries:
+            return None
+
+        slot, score = self._nearest(vector)
+        if score < self.threshold:
+            return None
+
+        value, expires_at = self._entries[slot]
+        if expires_at <= time.monotonic():
+            self._evict(slot)
+            return None
+
+        self._entries.move_to_end(slot)
+        return value
+
+    def set(self, vector: List[float], value: V):
+        if self._vectors is None:
+            self._vectors = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+
+        slot = None
+        if self._entries:
+            # a near-duplicate question replaces the existing answer
+            nearest, score = self._nearest(vector)
+            if score >= self.threshold:
+                slot = nearest
+                del self._entries[slot]
+        if slot is None:
+            if len(self._entries) >= self.maxsize:
+                self._evict(next(iter(self._entries)))
+            slot = int(np.argmin(self._used))
+
+        self._vectors[slot] = vector
+        self._used[slot] = True
+        self._entries[slot] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        self._entries.clear()
+        self._used[:] = False
@@ -0,0 +1,89 @@
+# src/stream.py
+
+from telegram import Bot, Message
+from telegram.constants import ChatType, MessageLimit
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from loguru import logger
+
+import asyncio
+import time
+
+# Telegram allows roughly one edit per second in private chats and 20 messages
+# per minute in groups; staying under both keeps streaming out of 429 territory
+PRIVATE_EDIT_INTERVAL = 1.0
+GROUP_EDIT_INTERVAL = 3.0
+
+
+def split_text(text: str) -> list[str]:
+    """Split `text` into chunks that each fit in one Telegram message."""
+    limit = MessageLimit.MAX_TEXT_LENGTH
+    return [text[i : i + limit] for i in range(0, len(text), limit)] or [text]
+
+
+async def send_text(bot: Bot, chat_id: int, text: str) -> Message:
+    """Send `text` as one or more messages and return the first."""
+    parts = split_text(text)
+    first = await bot.send_message(chat_id=chat_id, text=parts[0])
+    for part in parts[1:]:
+        await first.reply_text(part)
+    return first
+
+
+class ThrottledEditor:
+    """Progressively edits a bot message without exceeding Telegram's edit rate.
+
+    `update` may be called for every streamed token; only the latest text is
+    sent, at most once per interval. `finish` always sends the final text.
+    """
+
+    def __init__(self, message: Message, interval: float | None = None):
+        if interval is None:
+            interval = (
+                PRIVATE_EDIT_INTERVAL
+                if message.chat.type == ChatType.PRIVATE
+                else GROUP_EDIT_INTERVAL
+            )
+        self.message = message
+        self.interval = interval
+        self._sent_text = message.text
+        self._next_edit_at = 0.0
+
+    async def _edit(self, text: str):
+        if text == self._sent_text:
+            return
+        try:
+            await self.message.edit_text(text=text)
+            self._sent_text = text
+        except RetryAfter as e:
+            self._next_edit_at = time.monotonic() + e.retry_after
+            raise
+        except BadRequest as e:
+            if "message is not modified" not in e.message.lower():
+                raise
+        self._next_edit_at = time.monotonic() + self.interval
+
+    async def update(self, text: str):
+        """Show `text` if the last edit was long enough ago; otherwise skip it."""
+        if time.monotonic() < self._next_edit_at:
+            return
+        try:
+            # intermediate edits are best effort, the final one is not
+            await self._edit(text[: MessageLimit.MAX_TEXT_LENGTH])
+        except RetryAfter:
+            pass
+        except TelegramError as e:
+            logger.warning(f"Skipping streamed edit: {e}")
+            self._next_edit_at = time.monotonic() + self.interval
+
+    async def finish(self, text: str):
+        """Replace the message with `text`, spilling into follow-up messages if long."""
+        parts = split_text(text)
+
+        try:
+            await self._edit(parts[0])
+        except RetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+            await self._edit(parts[0])
+        for part in parts[1:]:
+            await self.message.reply_text(part)
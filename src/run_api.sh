@@ -4,7 +4,7 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )"
 PARENT_DIR="$(dirname "$SCRIPT_DIR")"
 cd "$SCRIPT_DIR"
 
-MAIN_SCRIPT="api_service:app"
+MAIN_SCRIPT="api_service:create_app"
 
 HOST="0.0.0.0"
 PORT=8000
@@ -29,12 +29,17 @@ run_server() {
   if [ "$MODE" = "development" ]; then
     export LOGFIRE_LEVEL="debug"
     uvicorn "$MAIN_SCRIPT" \
+      --factory \
       --host "$HOST" \
       --port "$PORT" \
       --reload
   else
     export LOGFIRE_LEVEL="info"
+    # lets /metrics aggregate over all uvicorn workers
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/telegram-api-metrics}"
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
     uvicorn "$MAIN_SCRIPT" \
+      --factory \
       --host "$HOST" \
       --port "$PORT" \
       --workers "$WORKERS"
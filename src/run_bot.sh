@@ -2,6 +2,7 @@
 
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )"
 PARENT_DIR="$(dirname "$SCRIPT_DIR")"
+cd "$SCRIPT_DIR"
 
 MAIN_SCRIPT="$SCRIPT_DIR/bot_service.py"
 